@@ -2,6 +2,7 @@ import unittest
 import requests
 import json
 import random
+import time
 
 ENDPOINT = "http://localhost:4567/"
 
@@ -18,7 +19,31 @@ class APITester(unittest.TestCase):
     def setUpClass(cls):
         cls.client = requests.Session()
         cls.connection = None
+        cls.wait_for_server()
         print("--- TODOS TEST STARTS --- ")
+
+    # Check once that the server is up, backing off between attempts, over the
+    # pooled session the tests use
+    @classmethod
+    def wait_for_server(cls, timeout=30.0):
+        delay = 0.05
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                # Bound each attempt too, in case the server accepts but never answers
+                attempt_timeout = max(deadline - time.monotonic(), 0.05)
+                if cls.client.get(ENDPOINT, timeout=min(attempt_timeout, 5.0)).status_code == 200:
+                    return
+                err = "server is not ready"
+            except requests.RequestException as error:
+                err = error
+            if time.monotonic() >= deadline:
+                print("Failure to connect")
+                print("Please try to start a new session")
+                print(err)
+                return
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
     
     @classmethod
     def tearDownClass(cls):
@@ -26,15 +51,6 @@ class APITester(unittest.TestCase):
             cls.connection.close()
             requests.get(ENDPOINT+"shutdown")
             
-    def setUp(self):
-        try :
-            self.connection = requests.get(ENDPOINT)
-            self.assertEqual(200, self.connection.status_code)
-        except Exception as err:
-            print("Failure to connect")
-            print("Please try to start a new session")
-            print(err)
-    
     @staticmethod
     def tearDown():
         pass
@@ -0,0 +1,175 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from LoadEngine import ENDPOINT, ENTITIES, OPERATIONS, JSON_HEADERS
+from PayloadCorpus import PayloadCorpus
+from AsyncHttpClient import AsyncConnection, split_endpoint
+from HdrHistogram import HdrHistogram
+from IdPool import IdPool
+from RunRecord import record_phase_results
+
+MAX_CONCURRENCY = 512
+
+
+# Latency and throughput of one POST/PUT/DELETE phase
+class PhaseResult:
+    def __init__(self, operation, concurrency):
+        self.operation = operation
+        self.concurrency = concurrency
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        # Wall-clock duration of the whole phase
+        self.elapsed = 0.0
+        self.histogram = HdrHistogram()
+
+    def add(self, sample_time, ok=True):
+        self.count += 1
+        self.total_time += sample_time
+        if sample_time > self.max_time:
+            self.max_time = sample_time
+        self.histogram.record(sample_time)
+        if not ok:
+            self.errors += 1
+
+    @property
+    def mean_time(self):
+        return self.total_time / self.count if self.count else 0.0
+
+    @property
+    def throughput(self):
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    # Fold another shard's result for the same phase into this one. Shards run
+    # the phase side by side, so wall-clock time is the slowest shard's.
+    def merge(self, other):
+        self.concurrency += other.concurrency
+        self.count += other.count
+        self.errors += other.errors
+        self.total_time += other.total_time
+        self.max_time = max(self.max_time, other.max_time)
+        self.elapsed = max(self.elapsed, other.elapsed)
+        self.histogram.merge(other.histogram)
+        return self
+
+    def as_dict(self):
+        percentiles = {f"p{percentile:g}_time": value for percentile, value in self.histogram.percentiles().items()}
+        return {
+            'operation': self.operation,
+            'concurrency': self.concurrency,
+            'count': self.count,
+            'errors': self.errors,
+            'elapsed': self.elapsed,
+            'throughput': self.throughput,
+            'mean_time': self.mean_time,
+            'max_time': self.max_time,
+            **percentiles,
+        }
+
+    def __str__(self):
+        percentiles = self.histogram.percentiles((50.0, 99.0, 99.9))
+        return (f"{self.operation:<6} x{self.count} (concurrency {self.concurrency}): "
+                f"{self.throughput:.1f} req/s, mean {self.mean_time * 1000:.2f} ms, "
+                f"p50 {percentiles[50.0] * 1000:.2f} ms, p99 {percentiles[99.0] * 1000:.2f} ms, "
+                f"p99.9 {percentiles[99.9] * 1000:.2f} ms, max {self.max_time * 1000:.2f} ms, errors {self.errors}")
+
+
+# Concurrent counterpart of LoadEngine: `concurrency` workers, each owning one
+# keep-alive connection, pull operations from a shared budget so exactly that
+# many requests are in flight until the phase drains.
+class AsyncLoadDriver:
+    def __init__(self, entity, endpoint=ENDPOINT, concurrency=16, corpus=None, seed=None, payload_offset=0):
+        if isinstance(entity, str):
+            entity = ENTITIES[entity]
+        if not 1 <= concurrency <= MAX_CONCURRENCY:
+            raise ValueError(f"concurrency must be between 1 and {MAX_CONCURRENCY}")
+        self.entity = entity
+        self.concurrency = concurrency
+        self.host, self.port, self.base_path = split_endpoint(endpoint)
+        self.random = random.Random(seed)
+        # Optional PayloadCorpus; `payload_offset` lets process shards start
+        # at different bodies of the same corpus
+        self.corpus = corpus
+        self.payload_index = payload_offset
+        self.headers = corpus.headers if corpus else JSON_HEADERS
+        self.created_ids = IdPool(rng=self.random)
+
+    def next_body(self):
+        if self.corpus is None:
+            return json.dumps(self.entity.generate_payload(self.random)).encode()
+        body = self.corpus[self.payload_index]
+        self.payload_index += 1
+        return body
+
+    def next_request(self, operation):
+        entity = self.entity
+        if operation == 'POST':
+            return entity.collection_url(self.base_path), self.next_body()
+        if not self.created_ids:
+            return None, None
+        if operation == 'PUT':
+            return entity.instance_url(self.created_ids.choice(), self.base_path), self.next_body()
+        return entity.instance_url(self.created_ids.pop_random(), self.base_path), None
+
+    async def worker(self, operation, budget, result):
+        connection = AsyncConnection(self.host, self.port)
+        try:
+            while budget[0] > 0:
+                budget[0] -= 1
+                path, body = self.next_request(operation)
+                if path is None:
+                    break
+                start_time = time.perf_counter()
+                status, headers, response_body = await connection.request(operation, path, body, self.headers)
+                sample_time = time.perf_counter() - start_time
+                result.add(sample_time, status < 400)
+                if operation == 'POST' and status == 201:
+                    self.created_ids.add(json.loads(response_body)['id'])
+        finally:
+            await connection.close()
+
+    async def run_phase(self, operation, count):
+        result = PhaseResult(operation, self.concurrency)
+        budget = [count]
+        workers = min(self.concurrency, count)
+        start_time = time.perf_counter()
+        await asyncio.gather(*(self.worker(operation, budget, result) for i in range(workers)))
+        result.elapsed = time.perf_counter() - start_time
+        return result
+
+    async def run_async(self, num_objects):
+        results = {}
+        results['POST'] = await self.run_phase('POST', num_objects)
+        results['PUT'] = await self.run_phase('PUT', num_objects)
+        results['DELETE'] = await self.run_phase('DELETE', len(self.created_ids))
+        return results
+
+    def run(self, num_objects):
+        return asyncio.run(self.run_async(num_objects))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent POST/PUT/DELETE load against the thingifier")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--corpus', help="pre-generated PayloadCorpus file to take bodies from")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    corpus = PayloadCorpus.open(args.corpus) if args.corpus else None
+    driver = AsyncLoadDriver(args.entity, args.endpoint, args.concurrency, corpus, args.seed)
+    results = driver.run(args.objects)
+    for operation in OPERATIONS:
+        print(results[operation])
+    if args.save:
+        record_phase_results(results, vars(args)).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import asyncio
+from urllib.parse import urlsplit
+
+# Minimal HTTP/1.1 keep-alive client on top of asyncio streams. Each
+# AsyncConnection carries one request at a time, so a driver with N workers
+# (one connection each) has exactly N requests in flight. The request parser
+# at the bottom is shared by the recording proxy and the stand-in server.
+
+
+class HttpError(Exception):
+    pass
+
+
+def split_endpoint(endpoint):
+    parts = urlsplit(endpoint)
+    host = parts.hostname or 'localhost'
+    port = parts.port or 80
+    base_path = parts.path or '/'
+    if not base_path.endswith('/'):
+        base_path += '/'
+    return host, port, base_path
+
+
+class AsyncConnection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.host_header = f"{host}:{port}"
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+    def encode_request(self, method, path, body=None, headers=None):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}"]
+        if headers:
+            lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        elif method in ('POST', 'PUT'):
+            lines.append("Content-Length: 0")
+        head = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+        return head + body if body else head
+
+    # Returns (status, headers, body). Reconnects once if the server closed an
+    # idle keep-alive connection underneath us.
+    async def request(self, method, path, body=None, headers=None):
+        data = self.encode_request(method, path, body, headers)
+        for attempt in (0, 1):
+            if self.writer is None:
+                await self.open()
+            try:
+                self.writer.write(data)
+                await self.writer.drain()
+                return await self.read_response(method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+
+    async def read_response(self, method):
+        reader = self.reader
+        status_line = await reader.readuntil(b"\r\n")
+        try:
+            status = int(status_line.split(None, 2)[1])
+        except (IndexError, ValueError):
+            raise HttpError(f"Malformed status line: {status_line!r}")
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self.read_chunked()
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, headers, body
+
+    async def read_chunked(self):
+        return await read_chunked(self.reader)
+
+
+async def read_chunked(reader):
+    chunks = []
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        size = int(size_line.split(b";", 1)[0], 16)
+        if size == 0:
+            # Skip trailers up to the terminating blank line
+            while await reader.readuntil(b"\r\n") != b"\r\n":
+                pass
+            return b"".join(chunks)
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+
+
+def header_name(name):
+    return '-'.join(part.capitalize() for part in name.split('-'))
+
+
+# Server side: (method, target, headers, body) of the next request on a
+# connection, with lower-cased header names, or None once the client is done
+async def read_request(reader):
+    try:
+        request_line = await reader.readuntil(b"\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    if not request_line.strip():
+        return None
+    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = await read_chunked(reader)
+    else:
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return method, target, headers, body
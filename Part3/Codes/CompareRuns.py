@@ -0,0 +1,150 @@
+import argparse
+import math
+import sys
+from RunRecord import RunRecord
+
+# Compares a new perf run against a stored baseline (both RunRecord JSON
+# files). Series are aligned by name (operation, or operation@object-count).
+# A series regresses when its latency distribution differs significantly
+# (two-sample Kolmogorov-Smirnov test on the histograms) *and* the mean, p50
+# or p99 got worse by more than the threshold, or when its throughput dropped
+# by more than the threshold.
+
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_ALPHA = 0.01
+COMPARED_PERCENTILES = (50.0, 99.0)
+
+
+# (upper bound of the bucket in microseconds, count) in increasing order
+def bucket_counts(histogram):
+    return [(histogram.value_range_at(index)[1], count) for index, count in histogram.nonzero_counts()]
+
+
+# Largest vertical distance between the two empirical CDFs, evaluated at every
+# bucket boundary present in either histogram
+def ks_statistic(baseline, new):
+    a, b = bucket_counts(baseline), bucket_counts(new)
+    n, m = baseline.total_count, new.total_count
+    i = j = 0
+    cumulative_a = cumulative_b = 0
+    distance = 0.0
+    while i < len(a) or j < len(b):
+        value = min(a[i][0] if i < len(a) else math.inf, b[j][0] if j < len(b) else math.inf)
+        while i < len(a) and a[i][0] == value:
+            cumulative_a += a[i][1]
+            i += 1
+        while j < len(b) and b[j][0] == value:
+            cumulative_b += b[j][1]
+            j += 1
+        distance = max(distance, abs(cumulative_a / n - cumulative_b / m))
+    return distance
+
+
+# Asymptotic p-value of the two-sample KS statistic
+def ks_p_value(distance, n, m):
+    effective = n * m / (n + m)
+    root = math.sqrt(effective)
+    lam = (root + 0.12 + 0.11 / root) * distance
+    if lam < 1e-3:
+        return 1.0
+    total = 0.0
+    for k in range(1, 101):
+        term = 2 * (-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam)
+        total += term
+        if abs(term) < 1e-10:
+            break
+    return min(max(total, 0.0), 1.0)
+
+
+def relative_change(baseline, new):
+    if not baseline:
+        return 0.0 if not new else math.inf
+    return (new - baseline) / baseline
+
+
+class SeriesComparison:
+    def __init__(self, name, baseline, new, threshold, alpha):
+        self.name = name
+        base_histogram, new_histogram = baseline['histogram'], new['histogram']
+        self.baseline_count = base_histogram.total_count
+        self.new_count = new_histogram.total_count
+        self.ks_distance = ks_statistic(base_histogram, new_histogram) \
+            if self.baseline_count and self.new_count else 0.0
+        self.p_value = ks_p_value(self.ks_distance, self.baseline_count, self.new_count) \
+            if self.baseline_count and self.new_count else 1.0
+
+        base_percentiles = base_histogram.percentiles(COMPARED_PERCENTILES)
+        new_percentiles = new_histogram.percentiles(COMPARED_PERCENTILES)
+        # metric -> (baseline, new, relative change); positive is worse
+        self.latency = {'mean': (base_histogram.mean, new_histogram.mean,
+                                 relative_change(base_histogram.mean, new_histogram.mean))}
+        for percentile in COMPARED_PERCENTILES:
+            before, after = base_percentiles[percentile], new_percentiles[percentile]
+            self.latency[f"p{percentile:g}"] = (before, after, relative_change(before, after))
+
+        self.throughput = None
+        if baseline.get('throughput') and new.get('throughput'):
+            before, after = baseline['throughput'], new['throughput']
+            # Lower throughput is worse, so flip the sign
+            self.throughput = (before, after, -relative_change(before, after))
+
+        self.reasons = []
+        if self.p_value < alpha:
+            for metric, (before, after, change) in self.latency.items():
+                if change > threshold:
+                    self.reasons.append(f"{metric} latency +{change:.1%}")
+        if self.throughput and self.throughput[2] > threshold:
+            self.reasons.append(f"throughput -{self.throughput[2]:.1%}")
+
+    @property
+    def regressed(self):
+        return bool(self.reasons)
+
+    def __str__(self):
+        latency = ', '.join(f"{metric} {before * 1000:.2f}->{after * 1000:.2f} ms ({change:+.1%})"
+                            for metric, (before, after, change) in self.latency.items())
+        line = f"{self.name:<16} {latency}; KS D={self.ks_distance:.3f} p={self.p_value:.3g}"
+        if self.throughput:
+            before, after, change = self.throughput
+            line += f"; {before:.1f}->{after:.1f} req/s"
+        if self.regressed:
+            line += "  REGRESSION: " + ', '.join(self.reasons)
+        return line
+
+
+def compare_runs(baseline, new, threshold=DEFAULT_THRESHOLD, alpha=DEFAULT_ALPHA):
+    comparisons = []
+    for name in baseline.series:
+        if name in new.series:
+            comparisons.append(SeriesComparison(name, baseline.series[name], new.series[name], threshold, alpha))
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a perf run against a stored baseline")
+    parser.add_argument('baseline', help="baseline RunRecord JSON")
+    parser.add_argument('new', help="new RunRecord JSON")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative change that counts as a regression (default 0.10)")
+    parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                        help="significance level for the distribution test (default 0.01)")
+    args = parser.parse_args()
+
+    baseline, new = RunRecord.load(args.baseline), RunRecord.load(args.new)
+    comparisons = compare_runs(baseline, new, args.threshold, args.alpha)
+    missing = sorted(set(baseline.series) - set(new.series))
+
+    for comparison in comparisons:
+        print(comparison)
+    if missing:
+        print("Missing from new run: " + ', '.join(missing))
+
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+    if regressions:
+        print(f"\n{len(regressions)} of {len(comparisons)} series regressed beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print(f"\nNo regressions across {len(comparisons)} series")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import random
+import string
+
+# The thingifier's entities and their relationships. Only the standard
+# library is imported here, so StandInServer can use these descriptors
+# without the harness's dependencies (requests, psutil).
+
+ENDPOINT = "http://localhost:4567/"
+
+
+def generate_random_string(length, rng=random):
+    return ''.join(rng.choices(string.ascii_letters, k=length))
+
+
+def generate_random_boolean(rng=random):
+    return rng.random() < 0.5
+
+
+STRING = 'string'
+BOOLEAN = 'boolean'
+
+
+# Describes one thingifier entity: where it lives, how to build a random
+# payload for it and which relationship endpoints hang off /<path>/:id
+class EntityDescriptor:
+    def __init__(self, name, path, element, fields, relationships=None):
+        self.name = name
+        self.path = path
+        # Root element of the entity's XML form, e.g. <todo>
+        self.element = element
+        # field name -> (STRING, length) or (BOOLEAN, None)
+        self.fields = fields
+        # relationship name -> target entity path (e.g. 'categories' -> 'categories')
+        self.relationships = relationships or {}
+
+    # `lengths` overrides the default length of string fields by name
+    def generate_payload(self, rng=random, lengths=None):
+        payload = {}
+        for field, (kind, length) in self.fields.items():
+            if kind == STRING:
+                payload[field] = generate_random_string(lengths.get(field, length) if lengths else length, rng)
+            else:
+                payload[field] = generate_random_boolean(rng)
+        return payload
+
+    def collection_url(self, endpoint=ENDPOINT):
+        return endpoint + self.path
+
+    def instance_url(self, id, endpoint=ENDPOINT):
+        return f"{endpoint}{self.path}/{id}"
+
+    def relationship_url(self, id, relationship, target_id=None, endpoint=ENDPOINT):
+        if relationship not in self.relationships:
+            raise ValueError(f"{self.name} has no relationship '{relationship}'")
+        url = f"{endpoint}{self.path}/{id}/{relationship}"
+        if target_id is not None:
+            url += f"/{target_id}"
+        return url
+
+    def __repr__(self):
+        return f"EntityDescriptor({self.name!r})"
+
+
+TODOS = EntityDescriptor('todos', 'todos', 'todo', {
+    "title": (STRING, 10),
+    "doneStatus": (BOOLEAN, None),
+    "description": (STRING, 20),
+}, relationships={'categories': 'categories', 'tasksof': 'projects'})
+
+PROJECTS = EntityDescriptor('projects', 'projects', 'project', {
+    "title": (STRING, 10),
+    "completed": (BOOLEAN, None),
+    "active": (BOOLEAN, None),
+    "description": (STRING, 20),
+}, relationships={'tasks': 'todos', 'categories': 'categories'})
+
+CATEGORIES = EntityDescriptor('categories', 'categories', 'category', {
+    "title": (STRING, 10),
+    "description": (STRING, 20),
+}, relationships={'todos': 'todos', 'projects': 'projects'})
+
+ENTITIES = {entity.name: entity for entity in (TODOS, PROJECTS, CATEGORIES)}
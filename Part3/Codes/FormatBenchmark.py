@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import json
+import time
+import xml.etree.ElementTree as ElementTree
+from LoadEngine import ENDPOINT, ENTITIES
+from AsyncHttpClient import AsyncConnection
+from AsyncDriver import AsyncLoadDriver, PhaseResult
+from PayloadCorpus import CONTENT_TYPES, PayloadCorpus
+from RunRecord import record_phase_results
+from ResultsWriter import open_results_writer
+
+# Runs the same workload (POST, GET by id, PUT, DELETE) once with JSON and
+# once with XML request bodies and Accept headers. Both formats draw their
+# bodies from PayloadCorpus with the same seed, so the payload values are
+# identical and only the encoding differs. For each format and operation it
+# reports server latency, bytes on the wire and the client's cost of parsing
+# the responses.
+
+FORMAT_OPERATIONS = ('POST', 'GET', 'PUT', 'DELETE')
+
+
+def decode_json(body):
+    return json.loads(body)
+
+
+def decode_xml(body):
+    return ElementTree.fromstring(body)
+
+
+def json_id(document):
+    return document['id']
+
+
+def xml_id(document):
+    return document.findtext('id')
+
+
+DECODERS = {'json': (decode_json, json_id), 'xml': (decode_xml, xml_id)}
+
+
+# PhaseResult plus wire and parse costs for one operation in one format
+class FormatResult:
+    def __init__(self, operation, format, concurrency):
+        self.operation = operation
+        self.format = format
+        self.latency = PhaseResult(f"{operation} {format}", concurrency)
+        # Whole encoded requests (request line, headers, body)
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.parse_time = 0.0
+        self.parsed = 0
+
+    def per_request(self, total):
+        return total / self.latency.count if self.latency.count else 0.0
+
+    def as_row(self):
+        percentiles = self.latency.histogram.percentiles((50.0, 99.0))
+        return {
+            'Operation': self.operation,
+            'Format': self.format,
+            'Requests': self.latency.count,
+            'Errors': self.latency.errors,
+            'Mean Time (s)': self.latency.mean_time,
+            'p50 Time (s)': percentiles[50.0],
+            'p99 Time (s)': percentiles[99.0],
+            'Throughput (ops/s)': self.latency.throughput,
+            'Request Bytes': self.per_request(self.request_bytes),
+            'Response Body Bytes': self.per_request(self.response_bytes),
+            'Parse Time (us)': self.parse_time / self.parsed * 1e6 if self.parsed else 0.0,
+        }
+
+
+class FormatDriver(AsyncLoadDriver):
+    def __init__(self, entity, format='json', endpoint=ENDPOINT, concurrency=16, num_objects=1000, seed=0,
+                 lengths=None):
+        # One POST and one PUT body per object
+        corpus = PayloadCorpus.generate(entity, 2 * num_objects, seed, format, lengths)
+        super().__init__(entity, endpoint, concurrency, corpus, seed)
+        self.format = format
+        self.headers = dict(corpus.headers, Accept=CONTENT_TYPES[format])
+        self.decode, self.document_id = DECODERS[format]
+
+    def next_request(self, operation):
+        if operation == 'GET':
+            if not self.created_ids:
+                return None, None
+            return self.entity.instance_url(self.created_ids.choice(), self.base_path), None
+        return super().next_request(operation)
+
+    async def worker(self, operation, budget, result):
+        connection = AsyncConnection(self.host, self.port)
+        try:
+            while budget[0] > 0:
+                budget[0] -= 1
+                path, body = self.next_request(operation)
+                if path is None:
+                    break
+                result.request_bytes += len(connection.encode_request(operation, path, body, self.headers))
+                start_time = time.perf_counter()
+                status, headers, response_body = await connection.request(operation, path, body, self.headers)
+                result.latency.add(time.perf_counter() - start_time, status < 400)
+                result.response_bytes += len(response_body)
+                if response_body:
+                    start_time = time.perf_counter()
+                    document = self.decode(response_body)
+                    result.parse_time += time.perf_counter() - start_time
+                    result.parsed += 1
+                    if operation == 'POST' and status == 201:
+                        self.created_ids.add(self.document_id(document))
+        finally:
+            await connection.close()
+
+    async def run_phase(self, operation, count):
+        result = FormatResult(operation, self.format, self.concurrency)
+        budget = [count]
+        start_time = time.perf_counter()
+        await asyncio.gather(*(self.worker(operation, budget, result) for i in range(min(self.concurrency, count))))
+        result.latency.elapsed = time.perf_counter() - start_time
+        return result
+
+    async def run_async(self, num_objects):
+        results = {}
+        for operation in FORMAT_OPERATIONS:
+            count = len(self.created_ids) if operation == 'DELETE' else num_objects
+            results[operation] = await self.run_phase(operation, count)
+        return results
+
+
+def compare_formats(entity, formats=('json', 'xml'), endpoint=ENDPOINT, concurrency=16, num_objects=1000, seed=0):
+    return {format: FormatDriver(entity, format, endpoint, concurrency, num_objects, seed).run(num_objects)
+            for format in formats}
+
+
+def print_comparison(results):
+    print(f"{'op':<7}{'format':<7}{'mean ms':>9}{'p99 ms':>9}{'req/s':>9}{'req B':>8}{'resp B':>8}{'parse us':>10}")
+    for operation in FORMAT_OPERATIONS:
+        for format, format_results in results.items():
+            row = format_results[operation].as_row()
+            print(f"{operation:<7}{format:<7}{row['Mean Time (s)'] * 1000:>9.2f}{row['p99 Time (s)'] * 1000:>9.2f}"
+                  f"{row['Throughput (ops/s)']:>9.1f}{row['Request Bytes']:>8.0f}"
+                  f"{row['Response Body Bytes']:>8.0f}{row['Parse Time (us)']:>10.1f}")
+    if len(results) == 2:
+        (first, first_results), (second, second_results) = results.items()
+        for operation in FORMAT_OPERATIONS:
+            a = first_results[operation].latency.mean_time
+            b = second_results[operation].latency.mean_time
+            if a and b:
+                faster, ratio = (first, b / a) if a < b else (second, a / b)
+                print(f"{operation}: {faster} is {ratio:.2f}x faster on mean latency")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON and XML bodies on an identical workload")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--objects', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--formats', default='json,xml')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--results', help="write one row per operation and format (.csv/.jsonl/.arrow)")
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    formats = args.formats.split(',')
+    for format in formats:
+        if format not in CONTENT_TYPES:
+            parser.error(f"unknown format '{format}'")
+    results = compare_formats(args.entity, formats, args.endpoint, args.concurrency, args.objects, args.seed)
+    print_comparison(results)
+    if args.results:
+        with open_results_writer(args.results) as writer:
+            writer.write_rows(result.as_row() for format_results in results.values()
+                              for result in format_results.values())
+    if args.save:
+        latencies = {result.latency.operation: result.latency for format_results in results.values()
+                     for result in format_results.values()}
+        record_phase_results(latencies, dict(vars(args), driver='FormatBenchmark')).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import math
+from array import array
+
+# Compact high-dynamic-range latency histogram (after Gil Tene's
+# HdrHistogram). Values are recorded as integer microseconds into log-linear
+# buckets that keep `significant_figures` decimal digits of precision across
+# the whole range, so memory is fixed up front no matter how many samples are
+# recorded, and two histograms with the same layout merge by adding counts.
+
+PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+MICROSECONDS = 1000000
+
+
+class HdrHistogram:
+    def __init__(self, highest_trackable=60 * MICROSECONDS, significant_figures=3):
+        if not 1 <= significant_figures <= 5:
+            raise ValueError("significant_figures must be between 1 and 5")
+        self.highest_trackable = highest_trackable
+        self.significant_figures = significant_figures
+
+        largest_single_unit = 2 * 10 ** significant_figures
+        self.sub_bucket_count_magnitude = max(math.ceil(math.log2(largest_single_unit)), 1)
+        self.sub_bucket_half_count_magnitude = self.sub_bucket_count_magnitude - 1
+        self.sub_bucket_count = 1 << self.sub_bucket_count_magnitude
+        self.sub_bucket_half_count = self.sub_bucket_count >> 1
+        self.sub_bucket_mask = self.sub_bucket_count - 1
+
+        smallest_untrackable = self.sub_bucket_count
+        bucket_count = 1
+        while smallest_untrackable <= highest_trackable:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+        self.bucket_count = bucket_count
+        self.counts = array('q', bytes(8 * (bucket_count + 1) * self.sub_bucket_half_count))
+
+        self.total_count = 0
+        self.total_value = 0
+        self.min_value = None
+        self.max_value = 0
+
+    def counts_index(self, value):
+        bucket_index = (value | self.sub_bucket_mask).bit_length() - self.sub_bucket_count_magnitude
+        sub_bucket_index = value >> bucket_index
+        bucket_base = (bucket_index + 1) << self.sub_bucket_half_count_magnitude
+        return bucket_base + (sub_bucket_index - self.sub_bucket_half_count)
+
+    def value_range_at(self, index):
+        bucket_index = (index >> self.sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self.sub_bucket_half_count - 1)) + self.sub_bucket_half_count
+        if bucket_index < 0:
+            sub_bucket_index -= self.sub_bucket_half_count
+            bucket_index = 0
+        lowest = sub_bucket_index << bucket_index
+        return lowest, lowest + (1 << bucket_index) - 1
+
+    # Record an integer number of microseconds; out-of-range values are clamped
+    def record_value(self, value, count=1):
+        if value < 0:
+            value = 0
+        elif value > self.highest_trackable:
+            value = self.highest_trackable
+        self.counts[self.counts_index(value)] += count
+        self.total_count += count
+        self.total_value += value * count
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+
+    # Record a latency given in seconds
+    def record(self, seconds):
+        self.record_value(int(seconds * MICROSECONDS + 0.5))
+
+    def merge(self, other):
+        if (other.significant_figures, other.bucket_count) != (self.significant_figures, self.bucket_count):
+            raise ValueError("Cannot merge histograms with different layouts")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total_count += other.total_count
+        self.total_value += other.total_value
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        self.max_value = max(self.max_value, other.max_value)
+        return self
+
+    # Values below are in seconds
+    def value_at_percentile(self, percentile):
+        if not self.total_count:
+            return 0.0
+        target = max(math.ceil(percentile / 100.0 * self.total_count), 1)
+        running = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                running += count
+                if running >= target:
+                    return min(self.value_range_at(index)[1], self.max_value) / MICROSECONDS
+        return self.max_value / MICROSECONDS
+
+    def percentiles(self, percentiles=PERCENTILES):
+        # One pass over the counts for every requested percentile
+        result = {}
+        if not self.total_count:
+            return {percentile: 0.0 for percentile in percentiles}
+        targets = sorted((max(math.ceil(p / 100.0 * self.total_count), 1), p) for p in percentiles)
+        position = 0
+        running = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            running += count
+            while position < len(targets) and running >= targets[position][0]:
+                result[targets[position][1]] = min(self.value_range_at(index)[1], self.max_value) / MICROSECONDS
+                position += 1
+            if position == len(targets):
+                break
+        return result
+
+    @property
+    def mean(self):
+        return self.total_value / self.total_count / MICROSECONDS if self.total_count else 0.0
+
+    @property
+    def min(self):
+        return (self.min_value or 0) / MICROSECONDS
+
+    @property
+    def max(self):
+        return self.max_value / MICROSECONDS
+
+    def summary(self, percentiles=PERCENTILES):
+        summary = {'count': self.total_count, 'mean': self.mean, 'min': self.min, 'max': self.max}
+        for percentile, value in self.percentiles(percentiles).items():
+            summary[f"p{percentile:g}"] = value
+        return summary
+
+    def __len__(self):
+        return self.total_count
+
+    # Sparse, JSON-friendly form: only non-empty buckets are stored
+    def to_dict(self):
+        return {
+            'highest_trackable': self.highest_trackable,
+            'significant_figures': self.significant_figures,
+            'total_value': self.total_value,
+            'min_value': self.min_value,
+            'max_value': self.max_value,
+            'counts': {str(index): count for index, count in enumerate(self.counts) if count},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(data['highest_trackable'], data['significant_figures'])
+        for index, count in data['counts'].items():
+            histogram.counts[int(index)] = count
+            histogram.total_count += count
+        histogram.total_value = data['total_value']
+        histogram.min_value = data['min_value']
+        histogram.max_value = data['max_value']
+        return histogram
+
+    # (index, count) of every non-empty bucket, in increasing value order
+    def nonzero_counts(self):
+        return [(index, count) for index, count in enumerate(self.counts) if count]
+
+
+# Render {label: histogram} as a fixed-width table of millisecond percentiles
+def format_percentile_table(histograms, percentiles=PERCENTILES):
+    columns = [f"p{percentile:g}" for percentile in percentiles]
+    header = f"{'':<24}{'count':>10}{'mean':>10}" + ''.join(f"{column:>10}" for column in columns) + f"{'max':>10}"
+    lines = [header]
+    for label, histogram in histograms.items():
+        values = histogram.percentiles(percentiles)
+        line = f"{str(label):<24}{histogram.total_count:>10}{histogram.mean * 1000:>10.2f}"
+        line += ''.join(f"{values[percentile] * 1000:>10.2f}" for percentile in percentiles)
+        line += f"{histogram.max * 1000:>10.2f}"
+        lines.append(line)
+    return "\n".join(lines) + "\n(milliseconds)"
@@ -0,0 +1,99 @@
+import random
+import threading
+from array import array
+
+# Live-object id registry for random update/delete targeting. Ids are kept
+# densely packed in an array (so a random pick is a single index) and a
+# second array maps id -> position, which makes removal of any id O(1): the
+# last id is moved into the hole. Memory is 8 bytes per live id for `ids`
+# plus 8 bytes per id *value* up to the largest id seen for `positions`. The
+# thingifier hands out small sequential integer ids, so that is about 16
+# bytes per id while the ids stay dense; after long churn `positions` grows
+# with the highest id issued, not with the number of live ids.
+# All operations take a lock, so one pool can be shared by worker threads;
+# process shards should each own a pool over their own ids.
+
+ABSENT = -1
+
+
+class IdPool:
+    def __init__(self, ids=(), rng=None):
+        self.ids = array('q')
+        self.positions = array('q')
+        self.lock = threading.Lock()
+        self.random = rng or random
+        for id in ids:
+            self.add(id)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return len(self.ids) > 0
+
+    def __contains__(self, id):
+        id = int(id)
+        return 0 <= id < len(self.positions) and self.positions[id] != ABSENT
+
+    def __iter__(self):
+        # Iterate over a snapshot so callers may modify the pool meanwhile
+        with self.lock:
+            snapshot = array('q', self.ids)
+        return iter(snapshot)
+
+    def add(self, id):
+        id = int(id)
+        if id < 0:
+            raise ValueError("ids must be non-negative integers")
+        with self.lock:
+            positions = self.positions
+            if id >= len(positions):
+                # Grow geometrically so repeated adds stay amortised O(1)
+                positions.extend([ABSENT] * max(id + 1 - len(positions), len(positions)))
+            elif positions[id] != ABSENT:
+                return
+            positions[id] = len(self.ids)
+            self.ids.append(id)
+
+    def choice(self):
+        with self.lock:
+            if not self.ids:
+                raise IndexError("choice from an empty IdPool")
+            return self.ids[self.random.randrange(len(self.ids))]
+
+    def remove(self, id):
+        id = int(id)
+        with self.lock:
+            if id not in self:
+                raise KeyError(id)
+            self.remove_at(self.positions[id])
+
+    def discard(self, id):
+        try:
+            self.remove(id)
+        except KeyError:
+            pass
+
+    def pop_random(self):
+        with self.lock:
+            if not self.ids:
+                raise IndexError("pop from an empty IdPool")
+            position = self.random.randrange(len(self.ids))
+            id = self.ids[position]
+            self.remove_at(position)
+            return id
+
+    # Caller holds the lock
+    def remove_at(self, position):
+        ids = self.ids
+        id = ids[position]
+        last = ids.pop()
+        if last != id:
+            ids[position] = last
+            self.positions[last] = position
+        self.positions[id] = ABSENT
+
+    def shuffled(self):
+        ids = list(self)
+        self.random.shuffle(ids)
+        return ids
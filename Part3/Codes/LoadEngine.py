@@ -0,0 +1,190 @@
+import json
+import time
+import random
+import requests
+from Entities import ENDPOINT, ENTITIES, STRING, TODOS, PROJECTS, CATEGORIES
+from HdrHistogram import HdrHistogram, format_percentile_table
+from ResourceSampler import ResourceSampler
+from RollingStats import RollingStats
+from IdPool import IdPool
+
+# Report a sample every `interval` objects, like the original testers did
+DEFAULT_INTERVAL = 500
+
+OPERATIONS = ('POST', 'PUT', 'DELETE')
+OPERATION_LABELS = {'POST': 'ADD', 'PUT': 'EDIT', 'DELETE': 'DELETE'}
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+# Shared create/update/delete driver for every entity. All timings use
+# time.perf_counter, and CPU/memory come from a background ResourceSampler so
+# nothing but the request itself sits inside the measured section.
+class LoadEngine:
+    def __init__(self, entity, endpoint=ENDPOINT, interval=DEFAULT_INTERVAL, client=None, verbose=True,
+                 sampler=None, server_monitor=None, writer=None, corpus=None, seed=None):
+        if isinstance(entity, str):
+            entity = ENTITIES[entity]
+        self.entity = entity
+        self.endpoint = endpoint
+        self.interval = interval
+        self.client = client or requests.Session()
+        self.verbose = verbose
+        self.sampler = sampler or ResourceSampler()
+        # Optional ServerMonitor: samples the thingifier process itself
+        self.server_sampler = ResourceSampler(self.sampler.period, sample=server_monitor.sample) \
+            if server_monitor else None
+        # Seeded, so id targeting repeats exactly for a given seed
+        self.random = random.Random(seed)
+        # Optional PayloadCorpus of pre-encoded bodies; otherwise bodies are
+        # generated and JSON-encoded per request
+        self.corpus = corpus
+        self.payload_index = 0
+        self.headers = corpus.headers if corpus else JSON_HEADERS
+        self.created_ids = IdPool(rng=self.random)
+        self.number_of_objects = 0
+        # Cumulative and per-`interval` window aggregates, O(1) per sample
+        self.stats = {operation: RollingStats(window=interval) for operation in OPERATIONS}
+        # Every latency goes into a per-operation histogram and a coarser one
+        # per (operation, object-count bucket of `interval` objects)
+        self.histograms = {operation: HdrHistogram() for operation in OPERATIONS}
+        self.bucket_histograms = {}
+        # One row per reporting point: see record(). With a ResultsWriter the
+        # rows are streamed to disk instead of accumulating in `report`.
+        self.writer = writer
+        self.report = []
+
+    def next_body(self):
+        if self.corpus is None:
+            return json.dumps(self.entity.generate_payload(self.random)).encode()
+        body = self.corpus[self.payload_index]
+        self.payload_index += 1
+        return body
+
+    def timed_request(self, method, url, body=None):
+        request = self.client.request
+        start_time = time.perf_counter()
+        response = request(method, url, data=body, headers=self.headers)
+        sample_time = time.perf_counter() - start_time
+        return response, sample_time
+
+    def record(self, operation, sample_time, report_point):
+        stats = self.stats[operation]
+        stats.add(sample_time)
+        self.histograms[operation].record(sample_time)
+        bucket = (operation, self.number_of_objects // self.interval * self.interval)
+        histogram = self.bucket_histograms.get(bucket)
+        if histogram is None:
+            histogram = self.bucket_histograms[bucket] = HdrHistogram(significant_figures=2)
+        histogram.record(sample_time)
+        if not report_point:
+            return
+        # Most recent background sample; no system calls on this path
+        usage = self.sampler.latest()
+        row = {
+            'Time (s)': time.perf_counter(),
+            'Objects Number': self.number_of_objects,
+            'Operation': operation,
+            'Sample Time (s)': sample_time,
+            'Transaction Time (s)': stats.total,
+            'Window Mean Time (s)': stats.window_mean,
+            'Window Throughput (ops/s)': stats.window_throughput,
+            'EWMA Time (s)': stats.ewma,
+            'CPU % Use': usage.cpu_percent if usage else None,
+            'Available Free Memory (MB)': usage.memory_available_mb if usage else None,
+        }
+        if self.server_sampler:
+            server = self.server_sampler.latest()
+            row['Server RSS (MB)'] = server.rss_mb if server else None
+            row['Server CPU Time (s)'] = server.cpu_time if server else None
+            row['Server Threads'] = server.threads if server else None
+            row['Server Open Files'] = server.open_files if server else None
+        if self.writer:
+            self.writer.write(row)
+        else:
+            self.report.append(row)
+        if self.verbose:
+            print(f"{self.number_of_objects} {self.entity.name} - {OPERATION_LABELS[operation]} {self.entity.name}")
+            print("Sample time: ", sample_time, " Transaction_time: ", stats.total)
+            print(f"Last {len(stats.recent)}: mean {stats.window_mean:.6f}s, {stats.window_throughput:.1f} ops/s")
+            if usage:
+                print(f"CPU Usage: {usage.cpu_percent}%, Available Memory: {usage.memory_available_mb:.2f} MB")
+            if row.get('Server RSS (MB)') is not None:
+                print(f"Server RSS: {row['Server RSS (MB)']:.2f} MB, Threads: {row['Server Threads']}, "
+                      f"Open files: {row['Server Open Files']}")
+
+    def create(self):
+        body = self.next_body()
+        response, sample_time = self.timed_request('POST', self.entity.collection_url(self.endpoint), body)
+        self.number_of_objects += 1
+        # Keep track of all the generated ids, for later PUT & DELETE use
+        self.created_ids.add(response.json()['id'])
+        self.record('POST', sample_time, self.number_of_objects % self.interval == 0)
+        return response
+
+    def update(self, id=None, report_point=None):
+        if id is None:
+            id = self.created_ids.choice()
+        body = self.next_body()
+        response, sample_time = self.timed_request('PUT', self.entity.instance_url(id, self.endpoint), body)
+        if report_point is None:
+            report_point = self.number_of_objects % self.interval == 0
+        self.record('PUT', sample_time, report_point)
+        return response
+
+    def delete(self, report_point=None):
+        id = self.created_ids.pop_random()
+        response, sample_time = self.timed_request('DELETE', self.entity.instance_url(id, self.endpoint))
+        if report_point is None:
+            report_point = self.number_of_objects % self.interval == 0
+        self.number_of_objects -= 1
+        self.record('DELETE', sample_time, report_point)
+        return response
+
+    # interleave=True: one create + one random update per iteration, then a
+    # delete phase (the todos/projects scripts).
+    # interleave=False: create everything, update every object once in random
+    # order, then delete everything (the categories script).
+    def run(self, num_objects, interleave=True):
+        samplers = [sampler for sampler in (self.sampler, self.server_sampler)
+                    if sampler and not sampler.running]
+        for sampler in samplers:
+            sampler.start()
+        try:
+            self.run_phases(num_objects, interleave)
+        finally:
+            for sampler in samplers:
+                sampler.stop()
+            if self.writer:
+                self.writer.flush()
+        return self.report
+
+    def run_phases(self, num_objects, interleave):
+        if interleave:
+            for i in range(num_objects):
+                self.create()
+                self.update()
+        else:
+            for i in range(num_objects):
+                self.create()
+            for count, id in enumerate(self.created_ids.shuffled()):
+                self.update(id, report_point=count % self.interval == 0)
+        count = 0
+        while self.created_ids:
+            self.delete(report_point=count % self.interval == 0)
+            count += 1
+
+    def summary(self):
+        summary = {}
+        for operation in OPERATIONS:
+            summary[operation] = self.histograms[operation].summary()
+            summary[operation]['total_time'] = self.stats[operation].total
+        return summary
+
+    def percentile_table(self, by_bucket=False):
+        if not by_bucket:
+            return format_percentile_table(self.histograms)
+        return format_percentile_table({
+            f"{operation} @{bucket}": self.bucket_histograms[(operation, bucket)]
+            for operation, bucket in sorted(self.bucket_histograms)
+        })
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import time
+from LoadEngine import ENDPOINT, ENTITIES, OPERATIONS
+from AsyncHttpClient import AsyncConnection
+from AsyncDriver import AsyncLoadDriver, PhaseResult
+from PayloadCorpus import PayloadCorpus
+from RunRecord import record_phase_results
+
+
+# Open-loop (constant arrival rate) results for one phase. `response_time`
+# is measured from when the request was *scheduled* to be sent, which
+# corrects for coordinated omission: if the server stalls, requests queued
+# behind the stall are charged for the time they waited. `service_time` is
+# the uncorrected send-to-response time a closed loop would have reported.
+class OpenLoopResult:
+    def __init__(self, operation, concurrency, rate):
+        self.operation = operation
+        self.rate = rate
+        self.response_time = PhaseResult(operation, concurrency)
+        self.service_time = PhaseResult(operation, concurrency)
+        # Requests that could not be dispatched on schedule for lack of a free connection
+        self.delayed = 0
+
+    def as_dict(self):
+        return {
+            'operation': self.operation,
+            'target_rate': self.rate,
+            'delayed': self.delayed,
+            'response_time': self.response_time.as_dict(),
+            'service_time': self.service_time.as_dict(),
+        }
+
+    def __str__(self):
+        return (f"{self.operation:<6} @ {self.rate:g} req/s target, {self.delayed} delayed\n"
+                f"  corrected: {self.response_time}\n"
+                f"  service:   {self.service_time}")
+
+
+# Issues requests at a fixed target rate regardless of how fast the server
+# answers. Requests are sent over a pool of `concurrency` keep-alive
+# connections; when all are busy the request waits for one, and that wait
+# counts towards its corrected response time.
+class OpenLoopDriver(AsyncLoadDriver):
+    def __init__(self, entity, endpoint=ENDPOINT, rate=100.0, concurrency=64, corpus=None, seed=None):
+        super().__init__(entity, endpoint, concurrency, corpus, seed)
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+
+    async def fire(self, operation, intended_time, pool, result):
+        connection = await pool.get()
+        try:
+            path, body = self.next_request(operation)
+            if path is None:
+                return
+            start_time = time.perf_counter()
+            if start_time - intended_time > 1.0 / self.rate:
+                result.delayed += 1
+            status, headers, response_body = await connection.request(operation, path, body, self.headers)
+            end_time = time.perf_counter()
+            ok = status < 400
+            result.response_time.add(end_time - intended_time, ok)
+            result.service_time.add(end_time - start_time, ok)
+            if operation == 'POST' and status == 201:
+                self.created_ids.add(json.loads(response_body)['id'])
+        finally:
+            pool.put_nowait(connection)
+
+    async def run_phase(self, operation, count):
+        result = OpenLoopResult(operation, self.concurrency, self.rate)
+        pool = asyncio.Queue()
+        connections = [AsyncConnection(self.host, self.port) for i in range(self.concurrency)]
+        for connection in connections:
+            pool.put_nowait(connection)
+
+        period = 1.0 / self.rate
+        tasks = []
+        start_time = time.perf_counter()
+        for i in range(count):
+            intended_time = start_time + i * period
+            delay = intended_time - time.perf_counter()
+            # Only yield to the loop when ahead of schedule; when behind, every
+            # overdue request is dispatched immediately
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(self.fire(operation, intended_time, pool, result)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start_time
+        result.response_time.elapsed = result.service_time.elapsed = elapsed
+
+        for connection in connections:
+            await connection.close()
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Constant-arrival-rate load against the thingifier")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--rate', type=float, default=100.0, help="target requests per second")
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=64, help="connection pool size")
+    parser.add_argument('--corpus', help="pre-generated PayloadCorpus file to take bodies from")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    corpus = PayloadCorpus.open(args.corpus) if args.corpus else None
+    driver = OpenLoopDriver(args.entity, args.endpoint, args.rate, args.concurrency, corpus, args.seed)
+    results = driver.run(args.objects)
+    for operation in OPERATIONS:
+        print(results[operation])
+    if args.save:
+        record_phase_results(results, vars(args)).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import argparse
+import importlib.util
+import io
+import multiprocessing
+import os
+import random
+import sys
+import time
+import traceback
+import unittest
+from queue import Empty
+from ServerMetrics import DEFAULT_JAR, SERVER_PORT
+from ServerLifecycle import ServerLifecycle
+
+# Runs the Part1 functional suite (Part1/RestAPITester.py) in parallel. The
+# tests mutate shared fixtures (todo 1, category 2, ...), so workers never
+# share a server: each worker process gets its own thingifier on its own
+# port, points the suite's module-level ENDPOINT at it and pulls test names
+# from a shared queue until the queue is empty. Within a worker tests still
+# run one at a time, exactly as in a serial run.
+#
+#   python ParallelSuite.py --workers 4 --jar ../../runTodoManagerRestAPI-1.5.5.jar
+#
+# Servers already listening on the ports are used as they are.
+
+SUITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'Part1', 'RestAPITester.py')
+SUITE_CLASS = 'APITester'
+
+
+def load_suite_module(path=SUITE_PATH):
+    spec = importlib.util.spec_from_file_location('RestAPITester', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Runs in a child process: one server, tests taken one by one from `tests`
+def suite_worker(suite_path, endpoint, tests, results):
+    module = load_suite_module(suite_path)
+    module.ENDPOINT = endpoint
+    test_class = getattr(module, SUITE_CLASS)
+    # The suite prints from setUp/setUpClass; keep worker output together
+    sys.stdout = io.StringIO()
+    test_class.setUpClass()
+    try:
+        for name in iter(tests.get, None):
+            result = unittest.TestResult()
+            start_time = time.perf_counter()
+            test_class(name).run(result)
+            duration = time.perf_counter() - start_time
+            outcome, details = 'ok', ''
+            for kind, problems in (('error', result.errors), ('fail', result.failures)):
+                if problems:
+                    outcome, details = kind, problems[0][1]
+            if result.skipped:
+                outcome, details = 'skip', result.skipped[0][1]
+            results.put((name, endpoint, outcome, duration, details))
+    except Exception:
+        results.put((None, endpoint, 'error', 0.0, traceback.format_exc()))
+    finally:
+        test_class.tearDownClass()
+
+
+# Outcomes from `results` until `expected` arrive or every process has exited
+def collect_outcomes(results, processes, expected):
+    outcomes = []
+    while len(outcomes) < expected:
+        try:
+            outcome = results.get(timeout=1.0)
+        except Empty:
+            if all(process.exitcode is not None for process in processes):
+                break
+            continue
+        outcomes.append(outcome)
+    for process in processes:
+        process.join()
+    return outcomes
+
+
+class ParallelSuiteRunner:
+    def __init__(self, workers=4, base_port=SERVER_PORT + 1, jar_path=DEFAULT_JAR, suite_path=SUITE_PATH, seed=None):
+        self.workers = workers
+        self.ports = [base_port + index for index in range(workers)]
+        self.jar_path = jar_path
+        self.suite_path = suite_path
+        self.seed = seed
+
+    def test_names(self):
+        module = load_suite_module(self.suite_path)
+        names = unittest.TestLoader().getTestCaseNames(getattr(module, SUITE_CLASS))
+        # Random order, like the suite's own RandomTestLoader
+        random.Random(self.seed).shuffle(names)
+        return names
+
+    def run(self):
+        names = self.test_names()
+        servers = [ServerLifecycle(self.jar_path, port) for port in self.ports]
+        context = multiprocessing.get_context()
+        tests = context.Queue()
+        results = context.Queue()
+        for name in names:
+            tests.put(name)
+        # One end marker per worker
+        for port in self.ports:
+            tests.put(None)
+        try:
+            # All jars boot side by side, then each is waited for in turn.
+            # Servers already running on a port are reused and left running.
+            for server in servers:
+                server.launch()
+            endpoints = [server.wait_until_ready().endpoint for server in servers]
+            start_time = time.perf_counter()
+            processes = [context.Process(target=suite_worker, args=(self.suite_path, endpoint, tests, results))
+                         for endpoint in endpoints]
+            for process in processes:
+                process.start()
+            outcomes = collect_outcomes(results, processes, len(names))
+            elapsed = time.perf_counter() - start_time
+        finally:
+            for server in servers:
+                server.close()
+        return outcomes, elapsed
+
+
+def print_report(outcomes, elapsed):
+    counts = {}
+    for name, endpoint, outcome, duration, details in outcomes:
+        counts[outcome] = counts.get(outcome, 0) + 1
+        if outcome in ('fail', 'error'):
+            print('=' * 70)
+            print(f"{outcome.upper()}: {name} ({endpoint})")
+            print('-' * 70)
+            print(details)
+    serial_time = sum(outcome[3] for outcome in outcomes)
+    print('-' * 70)
+    print(f"Ran {len(outcomes)} tests in {elapsed:.3f}s ({serial_time:.3f}s of test time, "
+          f"{serial_time / elapsed if elapsed else 0.0:.1f}x)")
+    print(', '.join(f"{count} {outcome}" for outcome, count in sorted(counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Part1 functional suite across isolated server instances")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--base-port', type=int, default=SERVER_PORT + 1, help="worker i uses base port + i")
+    parser.add_argument('--jar', default=DEFAULT_JAR)
+    parser.add_argument('--suite', default=SUITE_PATH)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    runner = ParallelSuiteRunner(args.workers, args.base_port, args.jar, args.suite, args.seed)
+    outcomes, elapsed = runner.run()
+    print_report(outcomes, elapsed)
+    sys.exit(0 if all(outcome[2] in ('ok', 'skip') for outcome in outcomes) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import json
+import mmap
+import random
+import struct
+from array import array
+from xml.sax.saxutils import escape
+from LoadEngine import ENTITIES
+
+# Pre-generated request bodies for a whole run. From a seed, every body is
+# built and encoded (JSON or XML) up front, so the request loop only slices
+# bytes out of a buffer: no payload generation or serialization per request,
+# and the same seed always gives byte-identical runs. Large corpora are
+# generated straight into a file, one body at a time, and memory-mapped
+# instead of loaded, so the corpus is never held in memory.
+#
+# File layout: MAGIC, header (count, content-type length), content type,
+# (count + 1) native-order uint64 offsets, then the concatenated bodies.
+
+MAGIC = b'PCORP001'
+HEADER = struct.Struct('=QQ')
+
+CONTENT_TYPES = {'json': 'application/json', 'xml': 'application/xml'}
+
+
+def encode_json(entity, payload):
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def encode_xml(entity, payload):
+    parts = [f"<{entity.element}>"]
+    for field, value in payload.items():
+        if isinstance(value, bool):
+            value = 'true' if value else 'false'
+        parts.append(f"<{field}>{escape(str(value))}</{field}>")
+    parts.append(f"</{entity.element}>")
+    return ''.join(parts).encode()
+
+
+ENCODERS = {'json': encode_json, 'xml': encode_xml}
+
+
+class PayloadCorpus:
+    def __init__(self, data, offsets, content_type, mapping=None, file=None):
+        self.data = data
+        self.offsets = offsets
+        self.content_type = content_type
+        self.headers = {'Content-Type': content_type}
+        self.mapping = mapping
+        self.file = file
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    # Body i, wrapping around when a run needs more bodies than were generated
+    def __getitem__(self, index):
+        index %= len(self)
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]])
+
+    # With `path`, the bodies are written to that file as they are encoded
+    # and the corpus returned is the memory-mapped file
+    @classmethod
+    def generate(cls, entity, count, seed=0, format='json', lengths=None, path=None):
+        if isinstance(entity, str):
+            entity = ENTITIES[entity]
+        encode = ENCODERS[format]
+        rng = random.Random(seed)
+        bodies = (encode(entity, entity.generate_payload(rng, lengths)) for i in range(count))
+        if path is not None:
+            write_corpus(path, count, CONTENT_TYPES[format], bodies)
+            return cls.open(path)
+        data = bytearray()
+        offsets = array('Q', [0])
+        for body in bodies:
+            data += body
+            offsets.append(len(data))
+        return cls(data, offsets, CONTENT_TYPES[format])
+
+    def save(self, path):
+        write_corpus(path, len(self), self.content_type, (self[index] for index in range(len(self))))
+
+    # Memory-map a saved corpus: only the pages actually used are read
+    @classmethod
+    def open(cls, path):
+        file = open(path, 'rb')
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if mapping[:len(MAGIC)] != MAGIC:
+            mapping.close()
+            file.close()
+            raise ValueError(f"{path} is not a payload corpus")
+        position = len(MAGIC)
+        count, type_length = HEADER.unpack_from(mapping, position)
+        position += HEADER.size
+        content_type = mapping[position:position + type_length].decode()
+        position += type_length
+        offsets = array('Q')
+        offsets.frombytes(mapping[position:position + 8 * (count + 1)])
+        position += 8 * (count + 1)
+        data = memoryview(mapping)[position:]
+        return cls(data, offsets, content_type, mapping, file)
+
+    def close(self):
+        if self.mapping is not None:
+            self.data.release()
+            self.mapping.close()
+            self.file.close()
+            self.mapping = self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Stream `count` bodies into a corpus file. The offset table is reserved up
+# front and filled in once every body is written, so only the offsets (8
+# bytes per body) are kept in memory.
+def write_corpus(path, count, content_type, bodies):
+    content_type = content_type.encode()
+    with open(path, 'wb') as file:
+        file.write(MAGIC)
+        file.write(HEADER.pack(count, len(content_type)))
+        file.write(content_type)
+        table = file.tell()
+        file.seek(8 * (count + 1), 1)
+        offsets = array('Q', [0])
+        for body in bodies:
+            file.write(body)
+            offsets.append(offsets[-1] + len(body))
+        if len(offsets) != count + 1:
+            raise ValueError(f"expected {count} bodies, got {len(offsets) - 1}")
+        file.seek(table)
+        file.write(offsets.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate a seeded corpus of encoded request bodies")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--count', type=int, default=20000, help="number of bodies")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=sorted(ENCODERS), default='json')
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    with PayloadCorpus.generate(args.entity, args.count, args.seed, args.format, path=args.output) as corpus:
+        print(f"{len(corpus)} {args.format} bodies, {len(corpus.data) / (1024 * 1024):.1f} MB -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
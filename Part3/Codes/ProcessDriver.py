@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+from queue import Empty
+from LoadEngine import ENDPOINT, ENTITIES, OPERATIONS
+from AsyncDriver import AsyncLoadDriver, PhaseResult
+from PayloadCorpus import PayloadCorpus
+from RunRecord import record_phase_results
+
+# Seconds to wait for the shards to exit before terminating them
+JOIN_TIMEOUT = 10.0
+
+
+# Split `total` operations as evenly as possible over `parts` shards
+def shard_sizes(total, parts):
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+# Runs in a child process. Each shard only updates and deletes the ids it
+# created itself, so shards never contend for the same objects. The barrier
+# keeps every shard in the same phase so merged throughput is meaningful.
+def shard_worker(entity_name, endpoint, concurrency, num_objects, seed, barrier, queue,
+                 corpus_path=None, payload_offset=0):
+    # Every shard maps the same corpus file; pages are shared by the OS
+    corpus = PayloadCorpus.open(corpus_path) if corpus_path else None
+    driver = AsyncLoadDriver(entity_name, endpoint, concurrency, corpus, seed, payload_offset)
+
+    async def run_phases():
+        results = {}
+        for operation in OPERATIONS:
+            barrier.wait()
+            count = len(driver.created_ids) if operation == 'DELETE' else num_objects
+            results[operation] = await driver.run_phase(operation, count)
+        return results
+
+    queue.put(asyncio.run(run_phases()))
+
+
+# Scales AsyncLoadDriver across `processes` worker processes so JSON encoding
+# and payload generation are never the bottleneck, then merges the shards'
+# per-phase results into one report.
+class ProcessLoadDriver:
+    def __init__(self, entity, endpoint=ENDPOINT, processes=None, concurrency=16, seed=None, corpus_path=None):
+        if isinstance(entity, str):
+            entity = ENTITIES[entity]
+        self.entity = entity
+        self.endpoint = endpoint
+        self.processes = processes or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.corpus_path = corpus_path
+
+    def run(self, num_objects):
+        context = multiprocessing.get_context()
+        sizes = [size for size in shard_sizes(num_objects, self.processes) if size]
+        if not sizes:
+            # Nothing to send; a Barrier of zero parties cannot be created
+            return {operation: PhaseResult(operation, 0) for operation in OPERATIONS}
+        barrier = context.Barrier(len(sizes))
+        queue = context.Queue()
+        # Each shard takes one POST and one PUT body per object, so shards get
+        # disjoint slices of the corpus
+        offsets = [2 * sum(sizes[:index]) for index in range(len(sizes))]
+        workers = [
+            context.Process(target=shard_worker,
+                            args=(self.entity.name, self.endpoint, self.concurrency, size,
+                                  self.seed + index, barrier, queue, self.corpus_path, offsets[index]))
+            for index, size in enumerate(sizes)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            shard_results = []
+            while len(shard_results) < len(workers):
+                try:
+                    shard_results.append(queue.get(timeout=1.0))
+                except Empty:
+                    # A crashed shard would leave the others waiting on the
+                    # barrier forever
+                    if any(worker.exitcode not in (None, 0) for worker in workers):
+                        barrier.abort()
+                        raise RuntimeError("a load shard exited with an error")
+        finally:
+            # A shard blocked on a full queue or a broken barrier never exits
+            # by itself once the parent stops reading
+            deadline = time.monotonic() + JOIN_TIMEOUT
+            for worker in workers:
+                worker.join(max(deadline - time.monotonic(), 0))
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+
+        merged = shard_results[0]
+        for results in shard_results[1:]:
+            for operation in OPERATIONS:
+                merged[operation].merge(results[operation])
+        return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process POST/PUT/DELETE load against the thingifier")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--concurrency', type=int, default=16, help="in-flight requests per process")
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--corpus', help="pre-generated PayloadCorpus file to take bodies from")
+    args = parser.parse_args()
+
+    driver = ProcessLoadDriver(args.entity, args.endpoint, args.processes, args.concurrency, args.seed, args.corpus)
+    results = driver.run(args.objects)
+    for operation in OPERATIONS:
+        print(results[operation])
+    if args.save:
+        record_phase_results(results, vars(args)).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import codecs
+import json
+import time
+from LoadEngine import LoadEngine, ENDPOINT, ENTITIES
+from HdrHistogram import HdrHistogram
+from ResultsWriter import open_results_writer
+
+# Measures how GET on a collection endpoint (/todos, /projects, /categories)
+# scales with the number of objects in it. The collection is grown in steps;
+# at every step the list endpoint is fetched `repeat` times and the body is
+# parsed incrementally as it arrives, so the harness never holds a whole
+# multi-megabyte response in memory.
+
+CHUNK_SIZE = 64 * 1024
+
+
+# Incrementally yields the elements of the array stored under `key` in a
+# top-level JSON object, e.g. each todo of {"todos": [{...}, {...}]}. Feed it
+# raw byte chunks; elements must be objects, arrays or strings (the
+# thingifier only returns objects) so a chunk boundary cannot split a value
+# into two valid ones.
+class StreamingArrayParser:
+    def __init__(self, key):
+        self.marker = json.dumps(key)
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.in_array = False
+        self.done = False
+        self.items = 0
+
+    def feed(self, chunk):
+        if self.done:
+            return
+        self.buffer += self.text_decoder.decode(chunk)
+        if not self.in_array:
+            start = self.buffer.find(self.marker)
+            if start < 0:
+                return
+            bracket = self.buffer.find('[', start + len(self.marker))
+            if bracket < 0:
+                return
+            self.in_array = True
+            self.position = bracket + 1
+
+        buffer = self.buffer
+        position = self.position
+        length = len(buffer)
+        while position < length:
+            character = buffer[position]
+            if character in ' \t\r\n,':
+                position += 1
+                continue
+            if character == ']':
+                self.done = True
+                break
+            try:
+                item, end = self.decoder.raw_decode(buffer, position)
+            except ValueError:
+                # Element is incomplete: wait for the next chunk
+                break
+            self.items += 1
+            position = end
+            yield item
+        # Drop everything already consumed
+        self.buffer = buffer[position:]
+        self.position = 0
+
+
+class ReadBenchmark:
+    def __init__(self, entity, endpoint=ENDPOINT, repeat=5, writer=None):
+        self.engine = LoadEngine(entity, endpoint, verbose=False)
+        self.entity = self.engine.entity
+        self.repeat = repeat
+        self.writer = writer
+        self.results = []
+
+    # One streamed GET of the collection: (latency, time to headers, bytes, items)
+    def fetch_collection(self):
+        parser = StreamingArrayParser(self.entity.path)
+        received = 0
+        start_time = time.perf_counter()
+        response = self.engine.client.get(self.entity.collection_url(self.engine.endpoint),
+                                          headers={'Accept': 'application/json'}, stream=True)
+        headers_time = time.perf_counter() - start_time
+        try:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                received += len(chunk)
+                for item in parser.feed(chunk):
+                    pass
+        finally:
+            response.close()
+        return time.perf_counter() - start_time, headers_time, received, parser.items
+
+    def measure(self, size):
+        histogram = HdrHistogram()
+        headers_total = 0.0
+        received = items = 0
+        for i in range(self.repeat):
+            latency, headers_time, received, items = self.fetch_collection()
+            histogram.record(latency)
+            headers_total += headers_time
+        percentiles = histogram.percentiles((50.0, 99.0))
+        row = {
+            'Objects Number': size,
+            'Items Returned': items,
+            'Bytes': received,
+            'Bytes per Object': received / items if items else 0.0,
+            'Mean Time (s)': histogram.mean,
+            'p50 Time (s)': percentiles[50.0],
+            'p99 Time (s)': percentiles[99.0],
+            'Mean Time to Headers (s)': headers_total / self.repeat,
+            'Throughput (MB/s)': received / histogram.mean / (1024 * 1024) if histogram.mean else 0.0,
+        }
+        if self.writer:
+            self.writer.write(row)
+        self.results.append(row)
+        return row
+
+    # Grow the collection by `step` objects up to `max_objects`, measuring the
+    # list endpoint at every size, then delete what was created
+    def run(self, max_objects, step=500, cleanup=True):
+        engine = self.engine
+        try:
+            self.print_row(self.measure(engine.number_of_objects))
+            while engine.number_of_objects < max_objects:
+                for i in range(min(step, max_objects - engine.number_of_objects)):
+                    engine.create()
+                self.print_row(self.measure(engine.number_of_objects))
+        finally:
+            if cleanup:
+                while engine.created_ids:
+                    engine.delete()
+        return self.results
+
+    def print_row(self, row):
+        print(f"{row['Objects Number']:>8} objects ({row['Items Returned']} listed): "
+              f"{row['Bytes'] / 1024:.1f} KB, mean {row['Mean Time (s)'] * 1000:.2f} ms, "
+              f"p99 {row['p99 Time (s)'] * 1000:.2f} ms, {row['Throughput (MB/s)']:.2f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List-endpoint latency and size as the collection grows")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--step', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=5, help="GETs per collection size")
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--results', help="stream rows to this .csv/.jsonl/.arrow file")
+    parser.add_argument('--keep', action='store_true', help="do not delete the created objects")
+    args = parser.parse_args()
+
+    writer = open_results_writer(args.results) if args.results else None
+    try:
+        ReadBenchmark(args.entity, args.endpoint, args.repeat, writer).run(args.objects, args.step, not args.keep)
+    finally:
+        if writer:
+            writer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from LoadEngine import ENDPOINT, ENTITIES, JSON_HEADERS
+from AsyncHttpClient import AsyncConnection, split_endpoint
+from AsyncDriver import PhaseResult
+from RunRecord import RunRecord
+from ResultsWriter import open_results_writer
+
+# How relationship storage scales with fan-out. Builds N todos, M categories
+# and P projects, then links them as bipartite graphs of increasing density:
+#
+#   todos/categories      each todo linked to density * M categories
+#   projects/tasks        each project linked to density * N todos
+#   categories/projects   each category linked to density * P projects
+#
+# At every density the new links are timed, then the relationship GETs of a
+# sample of sources. Finally the links are removed level by level, timing
+# the unlinks, so all three operations are reported against fan-out.
+
+GRAPHS = ('todos/categories', 'projects/tasks', 'categories/projects')
+DEFAULT_DENSITIES = (0.01, 0.05, 0.1, 0.25, 0.5)
+
+
+class RelationshipBenchmark:
+    def __init__(self, endpoint=ENDPOINT, todos=200, categories=200, projects=200, concurrency=16,
+                 samples=100, seed=None, writer=None):
+        self.host, self.port, self.base_path = split_endpoint(endpoint)
+        self.sizes = {'todos': todos, 'categories': categories, 'projects': projects}
+        self.concurrency = concurrency
+        self.samples = samples
+        self.random = random.Random(seed)
+        self.writer = writer
+        self.ids = {name: [] for name in self.sizes}
+        # graph -> source id -> list of linked target ids, in link order
+        self.links = {graph: {} for graph in GRAPHS}
+        self.results = []
+
+    # Send `requests` ((method, path, body) tuples) over `concurrency`
+    # connections, timing each into `result`. Returns the response bodies.
+    async def send_all(self, requests, result):
+        pending = iter(enumerate(requests))
+        responses = [None] * len(requests)
+
+        async def worker():
+            connection = AsyncConnection(self.host, self.port)
+            try:
+                for index, (method, path, body) in pending:
+                    start_time = time.perf_counter()
+                    status, headers, response = await connection.request(method, path, body, JSON_HEADERS)
+                    if result is not None:
+                        result.add(time.perf_counter() - start_time, status < 400)
+                    responses[index] = response if status < 400 else None
+            finally:
+                await connection.close()
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(worker() for i in range(self.concurrency)))
+        if result is not None:
+            result.elapsed = time.perf_counter() - start_time
+        return responses
+
+    async def populate(self):
+        for name, size in self.sizes.items():
+            entity = ENTITIES[name]
+            requests = [('POST', entity.collection_url(self.base_path),
+                         json.dumps(entity.generate_payload(self.random)).encode()) for i in range(size)]
+            for response in await self.send_all(requests, None):
+                if response:
+                    self.ids[name].append(json.loads(response)['id'])
+
+    def graph_entities(self, graph):
+        source, relationship = graph.split('/')
+        return ENTITIES[source], relationship, ENTITIES[ENTITIES[source].relationships[relationship]]
+
+    # Link every source up to `fanout` targets, choosing new targets at random
+    async def grow(self, graph, fanout):
+        source, relationship, target = self.graph_entities(graph)
+        links = self.links[graph]
+        pairs = []
+        requests = []
+        for source_id in self.ids[source.name]:
+            linked = links.setdefault(source_id, [])
+            missing = fanout - len(linked)
+            if missing <= 0:
+                continue
+            already = set(linked)
+            candidates = [target_id for target_id in self.ids[target.name] if target_id not in already]
+            for target_id in self.random.sample(candidates, min(missing, len(candidates))):
+                pairs.append((source_id, target_id))
+                requests.append(('POST', source.relationship_url(source_id, relationship, endpoint=self.base_path),
+                                 json.dumps({'id': str(target_id)}).encode()))
+        result = PhaseResult(f"link:{graph}", self.concurrency)
+        responses = await self.send_all(requests, result)
+        # Only links the server accepted, so shrink never unlinks a failed one
+        for (source_id, target_id), response in zip(pairs, responses):
+            if response is not None:
+                links[source_id].append(target_id)
+        return result
+
+    # Unlink the most recent links until every source is down to `fanout`
+    async def shrink(self, graph, fanout):
+        source, relationship, target = self.graph_entities(graph)
+        requests = []
+        for source_id, linked in self.links[graph].items():
+            while len(linked) > fanout:
+                target_id = linked.pop()
+                requests.append(('DELETE',
+                                 source.relationship_url(source_id, relationship, target_id, self.base_path), None))
+        result = PhaseResult(f"unlink:{graph}", self.concurrency)
+        await self.send_all(requests, result)
+        return result
+
+    async def read_related(self, graph):
+        source, relationship, target = self.graph_entities(graph)
+        sample = self.random.sample(self.ids[source.name], min(self.samples, len(self.ids[source.name])))
+        requests = [('GET', source.relationship_url(source_id, relationship, endpoint=self.base_path), None)
+                    for source_id in sample]
+        result = PhaseResult(f"related:{graph}", self.concurrency)
+        responses = await self.send_all(requests, result)
+        sizes = [len(response) for response in responses if response is not None]
+        return result, sum(sizes) / len(sizes) if sizes else 0.0
+
+    def fanout(self, graph, density):
+        source, relationship, target = self.graph_entities(graph)
+        return max(1, round(density * len(self.ids[target.name])))
+
+    def report(self, graph, density, fanout, result, response_bytes=None):
+        percentiles = result.histogram.percentiles((50.0, 99.0))
+        row = {
+            'Graph': graph,
+            'Operation': result.operation.split(':', 1)[0],
+            'Density': density,
+            'Fan-out': fanout,
+            'Requests': result.count,
+            'Errors': result.errors,
+            'Mean Time (s)': result.mean_time,
+            'p50 Time (s)': percentiles[50.0],
+            'p99 Time (s)': percentiles[99.0],
+            'Throughput (ops/s)': result.throughput,
+            'Mean Response Bytes': response_bytes,
+        }
+        self.results.append((density, result))
+        if self.writer:
+            self.writer.write(row)
+        size = f", {response_bytes / 1024:.1f} KB/response" if response_bytes is not None else ''
+        print(f"{graph:<20} {row['Operation']:<7} density {density:<5g} fan-out {fanout:>5}: {result.count:>6} req, "
+              f"mean {result.mean_time * 1000:.2f} ms, p99 {percentiles[99.0] * 1000:.2f} ms, "
+              f"{result.throughput:.1f} req/s{size}, errors {result.errors}")
+
+    async def run_async(self, densities=DEFAULT_DENSITIES, cleanup=True):
+        await self.populate()
+        levels = sorted(densities)
+        try:
+            for density in levels:
+                for graph in GRAPHS:
+                    fanout = self.fanout(graph, density)
+                    self.report(graph, density, fanout, await self.grow(graph, fanout))
+                    related, response_bytes = await self.read_related(graph)
+                    self.report(graph, density, fanout, related, response_bytes)
+            # Take the graphs back down through the same levels; unlinks are
+            # reported at the density and fan-out they start from
+            steps = levels[::-1]
+            for density, lower in zip(steps, steps[1:] + [None]):
+                for graph in GRAPHS:
+                    fanout = self.fanout(graph, lower) if lower else 0
+                    self.report(graph, density, self.fanout(graph, density), await self.shrink(graph, fanout))
+        finally:
+            if cleanup:
+                for name, ids in self.ids.items():
+                    entity = ENTITIES[name]
+                    await self.send_all([('DELETE', entity.instance_url(id, self.base_path), None) for id in ids], None)
+        return self.results
+
+    def run(self, densities=DEFAULT_DENSITIES, cleanup=True):
+        return asyncio.run(self.run_async(densities, cleanup))
+
+    # One series per operation and graph, bucketed by density: two densities
+    # can round to the same fan-out on a small graph
+    def run_record(self, meta=None):
+        record = RunRecord(dict({'driver': 'RelationshipBenchmark', 'sizes': self.sizes}, **(meta or {})))
+        for density, result in self.results:
+            record.add_series(result.operation, result.histogram, result.throughput, bucket=density)
+        return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Link/unlink/relationship-GET latency as fan-out grows")
+    parser.add_argument('--todos', type=int, default=200)
+    parser.add_argument('--categories', type=int, default=200)
+    parser.add_argument('--projects', type=int, default=200)
+    parser.add_argument('--densities', default=','.join(f"{density:g}" for density in DEFAULT_DENSITIES),
+                        help="comma-separated link densities between 0 and 1")
+    parser.add_argument('--samples', type=int, default=100, help="relationship GETs per graph and density")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--results', help="stream rows to this .csv/.jsonl/.arrow file")
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    parser.add_argument('--keep', action='store_true', help="do not delete the created objects")
+    args = parser.parse_args()
+
+    densities = [float(value) for value in args.densities.split(',')]
+    if not all(0 < density <= 1 for density in densities):
+        parser.error("densities must be in (0, 1]")
+    writer = open_results_writer(args.results) if args.results else None
+    try:
+        benchmark = RelationshipBenchmark(args.endpoint, args.todos, args.categories, args.projects,
+                                          args.concurrency, args.samples, args.seed, writer)
+        benchmark.run(densities, not args.keep)
+    finally:
+        if writer:
+            writer.close()
+    if args.save:
+        benchmark.run_record(vars(args)).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
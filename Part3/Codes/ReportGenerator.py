@@ -0,0 +1,199 @@
+import argparse
+import base64
+import html
+import io
+import os
+from ResultsWriter import read_results
+from RunRecord import RunRecord
+
+# Builds a self-contained HTML report (PNG charts embedded as base64, and
+# optionally written out as files) straight from a streamed results file and
+# a RunRecord, replacing the manual Excel charts in Chart/. Needs numpy and
+# matplotlib. Columns are loaded into numpy arrays once and every series is
+# min/max-decimated to about one point per pixel column before plotting, so
+# a million-row run renders in seconds without losing spikes.
+
+MAX_POINTS = 2000
+REPORT_PERCENTILES = (50.0, 95.0, 99.0, 99.9)
+
+# (column, y-axis label, x column) for each chart drawn from the results rows
+ROW_CHARTS = (
+    ('Sample Time (s)', 'Sample time (s)', 'Objects Number'),
+    ('Window Mean Time (s)', 'Window mean time (s)', 'Objects Number'),
+    ('Window Throughput (ops/s)', 'Throughput (ops/s)', 'Objects Number'),
+    ('CPU % Use', 'Host CPU (%)', 'Time (s)'),
+    ('Available Free Memory (MB)', 'Available memory (MB)', 'Time (s)'),
+    ('Server RSS (MB)', 'Server RSS (MB)', 'Objects Number'),
+    ('Server Threads', 'Server threads', 'Objects Number'),
+)
+
+
+# Column -> numpy array. Rows may carry different keys: a column is NaN
+# (or '' for text) in the rows that lack it. Columns that are not all
+# numbers (Operation, Graph, Format, Mode, Endpoint, ...) stay string arrays.
+def load_columns(path):
+    import numpy as np
+    columns = {}
+    count = 0
+    for row in read_results(path):
+        for key, value in row.items():
+            columns.setdefault(key, [None] * count).append(value)
+        count += 1
+        for values in columns.values():
+            if len(values) < count:
+                values.append(None)
+    arrays = {}
+    for key, values in columns.items():
+        # CSV gives strings and missing values as ''; JSONL gives None
+        try:
+            arrays[key] = np.asarray([np.nan if value in ('', None) else value for value in values], dtype=float)
+        except (TypeError, ValueError):
+            arrays[key] = np.asarray(['' if value is None else str(value) for value in values])
+    return arrays
+
+
+def is_numeric(array):
+    return array.dtype.kind == 'f'
+
+
+# Keep the min and max of each of ~max_points/2 equal-width bins
+def decimate(x, y, max_points=MAX_POINTS):
+    import numpy as np
+    if len(y) <= max_points:
+        return x, y
+    width = int(np.ceil(len(y) / (max_points // 2)))
+    usable = len(y) // width * width
+    bins_y = y[:usable].reshape(-1, width)
+    bins_x = x[:usable].reshape(-1, width)
+    rows = np.arange(bins_y.shape[0])
+    low = np.argmin(np.where(np.isnan(bins_y), np.inf, bins_y), axis=1)
+    high = np.argmax(np.where(np.isnan(bins_y), -np.inf, bins_y), axis=1)
+    first = np.minimum(low, high)
+    second = np.maximum(low, high)
+    out_x = np.column_stack((bins_x[rows, first], bins_x[rows, second])).ravel()
+    out_y = np.column_stack((bins_y[rows, first], bins_y[rows, second])).ravel()
+    # The leftover partial bin is short enough to keep as is
+    return np.concatenate((out_x, x[usable:])), np.concatenate((out_y, y[usable:]))
+
+
+def figure_to_png(figure):
+    import matplotlib.pyplot as plt
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    plt.close(figure)
+    return buffer.getvalue()
+
+
+def row_charts(columns):
+    import numpy as np
+    import matplotlib.pyplot as plt
+    charts = []
+    operations = np.unique(columns['Operation']) if 'Operation' in columns else []
+    for column, label, x_column in ROW_CHARTS:
+        if column not in columns or x_column not in columns:
+            continue
+        if not is_numeric(columns[column]) or not is_numeric(columns[x_column]) or np.all(np.isnan(columns[column])):
+            continue
+        figure, axes = plt.subplots(figsize=(9, 4))
+        x_values = columns[x_column]
+        if x_column == 'Time (s)':
+            x_values = x_values - np.nanmin(x_values)
+        for operation in operations:
+            mask = columns['Operation'] == operation
+            x, y = decimate(x_values[mask], columns[column][mask])
+            axes.plot(x, y, label=operation, linewidth=1)
+        axes.set_xlabel('Elapsed time (s)' if x_column == 'Time (s)' else 'Number of objects')
+        axes.set_ylabel(label)
+        axes.grid(True, alpha=0.3)
+        axes.legend()
+        charts.append((label, figure_to_png(figure)))
+    return charts
+
+
+# p50..p99.9 against object count, from the per-bucket histograms
+def percentile_charts(record):
+    import matplotlib.pyplot as plt
+    charts = []
+    by_operation = {}
+    for entry in record.series.values():
+        if entry['bucket'] is not None:
+            by_operation.setdefault(entry['operation'], []).append(entry)
+    for operation, entries in sorted(by_operation.items()):
+        entries.sort(key=lambda entry: entry['bucket'])
+        buckets = [entry['bucket'] for entry in entries]
+        values = [entry['histogram'].percentiles(REPORT_PERCENTILES) for entry in entries]
+        figure, axes = plt.subplots(figsize=(9, 4))
+        for percentile in REPORT_PERCENTILES:
+            axes.plot(buckets, [value[percentile] * 1000 for value in values], label=f"p{percentile:g}", linewidth=1)
+        axes.set_xlabel('Number of objects')
+        axes.set_ylabel(f'{operation} latency (ms)')
+        axes.set_yscale('log')
+        axes.grid(True, alpha=0.3)
+        axes.legend()
+        charts.append((f'{operation} latency percentiles', figure_to_png(figure)))
+    return charts
+
+
+def percentile_table_html(record):
+    headers = ['series', 'count', 'mean'] + [f"p{percentile:g}" for percentile in REPORT_PERCENTILES] + ['max', 'req/s']
+    rows = []
+    for name, entry in record.series.items():
+        if entry['bucket'] is not None:
+            continue
+        histogram = entry['histogram']
+        values = histogram.percentiles(REPORT_PERCENTILES)
+        cells = [name, str(histogram.total_count), f"{histogram.mean * 1000:.2f}"]
+        cells += [f"{values[percentile] * 1000:.2f}" for percentile in REPORT_PERCENTILES]
+        cells += [f"{histogram.max * 1000:.2f}", f"{entry['throughput']:.1f}" if entry.get('throughput') else '']
+        rows.append(cells)
+    head = ''.join(f"<th>{html.escape(header)}</th>" for header in headers)
+    body = ''.join('<tr>' + ''.join(f"<td>{html.escape(cell)}</td>" for cell in cells) + '</tr>' for cells in rows)
+    return f"<table><tr>{head}</tr>{body}</table><p>Latencies in milliseconds.</p>"
+
+
+def generate_report(output, results_path=None, run_path=None, png_dir=None, title='Thingifier performance report'):
+    import matplotlib
+    matplotlib.use('Agg')
+    charts = []
+    sections = []
+    if run_path:
+        record = RunRecord.load(run_path)
+        sections.append(percentile_table_html(record))
+        charts.extend(percentile_charts(record))
+    if results_path:
+        charts.extend(row_charts(load_columns(results_path)))
+
+    if png_dir:
+        os.makedirs(png_dir, exist_ok=True)
+    for label, png in charts:
+        if png_dir:
+            filename = ''.join(character if character.isalnum() else '_' for character in label).strip('_') + '.png'
+            with open(os.path.join(png_dir, filename), 'wb') as file:
+                file.write(png)
+        encoded = base64.b64encode(png).decode('ascii')
+        sections.append(f"<h2>{html.escape(label)}</h2>"
+                        f"<img alt=\"{html.escape(label)}\" src=\"data:image/png;base64,{encoded}\">")
+
+    with open(output, 'w') as file:
+        file.write(f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+                   "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+                   "td,th{border:1px solid #ccc;padding:4px 8px;text-align:right}</style></head>"
+                   f"<body><h1>{html.escape(title)}</h1>{''.join(sections)}</body></html>")
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render an HTML/PNG report from perf-run output")
+    parser.add_argument('--results', help="results file written by ResultsWriter (.csv/.jsonl/.arrow)")
+    parser.add_argument('--run', help="RunRecord JSON with latency histograms")
+    parser.add_argument('--output', default='report.html')
+    parser.add_argument('--png-dir', help="also write each chart as a PNG into this directory")
+    parser.add_argument('--title', default='Thingifier performance report')
+    args = parser.parse_args()
+    if not args.results and not args.run:
+        parser.error("give --results, --run or both")
+    print(generate_report(args.output, args.results, args.run, args.png_dir, args.title))
+
+
+if __name__ == '__main__':
+    main()
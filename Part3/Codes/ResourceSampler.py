@@ -0,0 +1,83 @@
+import collections
+import threading
+import time
+import psutil
+
+MEGABYTE = 1024 * 1024
+# Half an hour at the default period; older samples are dropped
+DEFAULT_MAX_SAMPLES = 3600
+
+# Timestamps use time.perf_counter, the same clock as the latency samples
+ResourceSample = collections.namedtuple(
+    'ResourceSample', ['time', 'cpu_percent', 'memory_used_mb', 'memory_available_mb'])
+
+
+def record_cpu_memory_usage():
+    memory = psutil.virtual_memory()
+    return ResourceSample(time.perf_counter(), psutil.cpu_percent(),
+                          memory.used / MEGABYTE, memory.available / MEGABYTE)
+
+
+# Samples host CPU and memory on a background thread at a fixed period, so the
+# request loop never makes a psutil call. cpu_percent() is measured over the
+# whole period between two samples rather than between back-to-back requests.
+class ResourceSampler:
+    def __init__(self, period=0.5, max_samples=DEFAULT_MAX_SAMPLES, sample=record_cpu_memory_usage):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.sample = sample
+        self.samples = collections.deque(maxlen=max_samples)
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def run(self):
+        # The first sample is taken one period after start(), so its
+        # cpu_percent covers the whole period since the priming call
+        next_time = time.perf_counter() + self.period
+        while not self.stopped.wait(max(next_time - time.perf_counter(), 0)):
+            sample = self.sample()
+            if sample is not None:
+                self.samples.append(sample)
+            next_time += self.period
+            now = time.perf_counter()
+            if next_time < now:
+                # Fell behind (e.g. the host is saturated): resynchronise
+                # rather than firing a burst of catch-up samples
+                next_time = now + self.period
+
+    def start(self):
+        if self.thread is not None:
+            return self
+        # Prime cpu_percent so the first real sample covers one full period
+        psutil.cpu_percent()
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.run, name='resource-sampler', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def running(self):
+        return self.thread is not None
+
+    def latest(self):
+        try:
+            return self.samples[-1]
+        except IndexError:
+            return None
+
+    def samples_between(self, start_time, end_time):
+        return [sample for sample in self.samples if start_time <= sample.time <= end_time]
@@ -0,0 +1,195 @@
+import abc
+import csv
+import json
+import os
+import time
+
+# Streams result rows (dicts) to disk as they are produced instead of keeping
+# them in memory until the end of the run. Rows are flushed every
+# `flush_every` rows or `flush_interval` seconds, whichever comes first, so a
+# crash loses at most one flush window and memory use does not grow with the
+# length of the run.
+
+
+class ResultsWriter(abc.ABC):
+    def __init__(self, path, flush_every=100, flush_interval=5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.pending = 0
+        self.last_flush = time.monotonic()
+        self.closed = False
+
+    def write(self, row):
+        self.write_row(row)
+        self.rows_written += 1
+        self.pending += 1
+        if self.pending >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        if self.pending:
+            self.flush_rows()
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.close_file()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abc.abstractmethod
+    def write_row(self, row):
+        pass
+
+    @abc.abstractmethod
+    def flush_rows(self):
+        pass
+
+    @abc.abstractmethod
+    def close_file(self):
+        pass
+
+
+class CsvResultsWriter(ResultsWriter):
+    # The header is taken from `fieldnames` or the first row; later rows may
+    # leave columns out but not add new ones
+    def __init__(self, path, fieldnames=None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.fieldnames = fieldnames
+        self.file = open(path, 'w', newline='')
+        self.writer = None
+
+    def write_row(self, row):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames or list(row))
+            self.writer.writeheader()
+        self.writer.writerow(row)
+
+    def flush_rows(self):
+        self.file.flush()
+
+    def close_file(self):
+        self.file.close()
+
+
+class JsonlResultsWriter(ResultsWriter):
+    def __init__(self, path, **kwargs):
+        super().__init__(path, **kwargs)
+        self.file = open(path, 'w')
+
+    def write_row(self, row):
+        self.file.write(json.dumps(row))
+        self.file.write('\n')
+
+    def flush_rows(self):
+        self.file.flush()
+
+    def close_file(self):
+        self.file.close()
+
+
+# Columnar output as an Arrow IPC *stream*: every flush appends a complete
+# record batch, so a truncated file is still readable up to the last flush
+# (unlike Parquet, whose footer is only written on close). Needs pyarrow.
+#
+# Every batch must share one schema. Pass `schema` (a pyarrow.Schema or a
+# {column: pyarrow type} dict) to fix it; otherwise it is built from the
+# first batch's keys: numbers as float64 (so an int column may later hold a
+# float), strings as string, booleans as bool, and a column that is None in
+# every row of the first batch as float64 rather than Arrow's null type.
+class ArrowResultsWriter(ResultsWriter):
+    def __init__(self, path, schema=None, **kwargs):
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError:
+            raise ImportError("Columnar results need pyarrow: pip install pyarrow")
+        super().__init__(path, **kwargs)
+        self.pyarrow = pyarrow
+        self.sink = pyarrow.OSFile(path, 'wb')
+        self.writer = None
+        self.schema = pyarrow.schema(schema) if isinstance(schema, dict) else schema
+        self.buffer = []
+
+    def write_row(self, row):
+        self.buffer.append(row)
+
+    def column_type(self, values):
+        pa = self.pyarrow
+        value = next((value for value in values if value is not None), None)
+        if isinstance(value, bool):
+            return pa.bool_()
+        if isinstance(value, str):
+            return pa.string()
+        return pa.float64()
+
+    def infer_schema(self, rows):
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        return self.pyarrow.schema([(column, self.column_type(row.get(column) for row in rows))
+                                    for column in columns])
+
+    def flush_rows(self):
+        pa = self.pyarrow
+        if self.schema is None:
+            self.schema = self.infer_schema(self.buffer)
+        batch = pa.RecordBatch.from_pylist(self.buffer, schema=self.schema)
+        if self.writer is None:
+            self.writer = pa.ipc.new_stream(self.sink, self.schema)
+        self.writer.write_batch(batch)
+        self.sink.flush()
+        self.buffer = []
+
+    def close_file(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.sink.close()
+
+
+WRITERS = {'.csv': CsvResultsWriter, '.jsonl': JsonlResultsWriter, '.arrow': ArrowResultsWriter}
+
+
+# Pick the writer from the file extension (.csv, .jsonl or .arrow)
+def open_results_writer(path, **kwargs):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported results format '{extension}', expected one of {sorted(WRITERS)}")
+    return WRITERS[extension](path, **kwargs)
+
+
+# Read rows back from a results file, one at a time. CSV values come back as
+# strings. A truncated .arrow stream yields every batch before the damage.
+def read_results(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.arrow':
+        import pyarrow
+        import pyarrow.ipc
+        with pyarrow.ipc.open_stream(path) as reader:
+            try:
+                for batch in reader:
+                    yield from batch.to_pylist()
+            except pyarrow.ArrowInvalid:
+                return
+        return
+    with open(path, newline='') as file:
+        if extension == '.jsonl':
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == '.csv':
+            yield from csv.DictReader(file)
+        else:
+            raise ValueError(f"Cannot read results format '{extension}'")
@@ -0,0 +1,72 @@
+import collections
+import time
+
+# Incremental transaction-time statistics, O(1) per sample: cumulative
+# totals, a sliding window over the last `window` samples (running sum kept
+# alongside a deque, so nothing is ever re-summed) and an exponentially
+# weighted moving average.
+
+
+class RollingStats:
+    def __init__(self, window=500, alpha=0.05):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.window = window
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.ewma = None
+        # (sample_time, end timestamp) of the last `window` samples
+        self.recent = collections.deque()
+        self.window_total = 0.0
+
+    def add(self, sample_time, timestamp=None):
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self.count += 1
+        self.total += sample_time
+        if self.min is None or sample_time < self.min:
+            self.min = sample_time
+        if sample_time > self.max:
+            self.max = sample_time
+        self.ewma = sample_time if self.ewma is None else self.ewma + self.alpha * (sample_time - self.ewma)
+
+        recent = self.recent
+        recent.append((sample_time, timestamp))
+        self.window_total += sample_time
+        if len(recent) > self.window:
+            self.window_total -= recent.popleft()[0]
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def window_mean(self):
+        return self.window_total / len(self.recent) if self.recent else 0.0
+
+    # Completed operations per second over the window, measured from when the
+    # window's first request started to when its last one finished
+    @property
+    def window_throughput(self):
+        if not self.recent:
+            return 0.0
+        first_time, first_end = self.recent[0]
+        elapsed = self.recent[-1][1] - (first_end - first_time)
+        return len(self.recent) / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'min': self.min or 0.0,
+            'max': self.max,
+            'window_mean': self.window_mean,
+            'window_throughput': self.window_throughput,
+            'ewma': self.ewma or 0.0,
+        }
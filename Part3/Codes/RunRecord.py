@@ -0,0 +1,69 @@
+import json
+import time
+from HdrHistogram import HdrHistogram
+
+# A stored perf run: a JSON file holding, for every series (an operation, or
+# an operation within one object-count bucket), its latency histogram and
+# throughput. CompareRuns aligns two of these by series name.
+#
+#   {"meta": {...}, "series": {"POST": {"operation": "POST", "bucket": null,
+#    "throughput": 812.4, "histogram": {...}}, "POST@500": {...}}}
+
+
+def series_name(operation, bucket=None):
+    return operation if bucket is None else f"{operation}@{bucket}"
+
+
+class RunRecord:
+    def __init__(self, meta=None):
+        self.meta = dict(meta or {})
+        self.meta.setdefault('created', time.strftime('%Y-%m-%dT%H:%M:%S'))
+        self.series = {}
+
+    def add_series(self, operation, histogram, throughput=None, bucket=None):
+        self.series[series_name(operation, bucket)] = {
+            'operation': operation,
+            'bucket': bucket,
+            'throughput': throughput,
+            'histogram': histogram,
+        }
+
+    def save(self, path):
+        series = {
+            name: dict(entry, histogram=entry['histogram'].to_dict())
+            for name, entry in self.series.items()
+        }
+        with open(path, 'w') as file:
+            json.dump({'meta': self.meta, 'series': series}, file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            data = json.load(file)
+        record = cls(data.get('meta'))
+        for name, entry in data['series'].items():
+            record.series[name] = dict(entry, histogram=HdrHistogram.from_dict(entry['histogram']))
+        return record
+
+
+# Build a RunRecord from a finished LoadEngine run. Throughput of the serial
+# engine is operations per second of request time.
+def record_engine_run(engine, meta=None):
+    record = RunRecord(dict({'driver': 'LoadEngine', 'entity': engine.entity.name,
+                             'interval': engine.interval}, **(meta or {})))
+    for operation, histogram in engine.histograms.items():
+        total = engine.stats[operation].total
+        record.add_series(operation, histogram, histogram.total_count / total if total else None)
+    for (operation, bucket), histogram in engine.bucket_histograms.items():
+        record.add_series(operation, histogram, bucket=bucket)
+    return record
+
+
+# Build a RunRecord from AsyncLoadDriver / ProcessLoadDriver phase results
+def record_phase_results(results, meta=None):
+    record = RunRecord(dict({'driver': 'AsyncLoadDriver'}, **(meta or {})))
+    for operation, result in results.items():
+        # Open-loop results: compare the coordinated-omission-corrected times
+        result = getattr(result, 'response_time', result)
+        record.add_series(operation, result.histogram, result.throughput)
+    return record
@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import collections
+import time
+from LoadEngine import ENDPOINT, JSON_HEADERS
+from AsyncHttpClient import AsyncConnection
+from AsyncDriver import PhaseResult
+from Workload import WorkloadDriver, WorkloadProfile
+from RunRecord import RunRecord
+from ResultsWriter import open_results_writer
+
+# Finds the saturation point of each endpoint instead of guessing a load
+# level. The load is stepped upward, either as concurrency (closed loop:
+# N connections each sending back to back) or as an arrival rate (open
+# loop: requests scheduled at a fixed rate, latency measured from the
+# scheduled time). Each step is held in short windows until the mean latency
+# of the last few windows agrees within a tolerance, and only those steady
+# windows are reported.
+#
+# The knee is the first step that buys little throughput for the load it
+# adds while its p99 has grown several times over the lightest step's (or
+# that fails requests, or in open loop never settles). The best throughput
+# seen before the knee is the endpoint's maximum sustainable rate.
+#
+# Endpoints are Workload operations such as get:todos or related:todos/categories.
+
+DEFAULT_OPERATIONS = ('get:todos', 'list:todos', 'create:todos', 'update:todos', 'related:todos/categories')
+# Kinds that consume their own targets cannot be held at a steady load
+DRAINING_KINDS = ('delete', 'unlink')
+# A step is a plateau if it converts less than this share of its extra load into throughput
+PLATEAU_EFFICIENCY = 0.25
+# ... and p99 has exploded if it is this many times the first step's
+LATENCY_FACTOR = 3.0
+MAX_ERROR_RATE = 0.01
+
+
+# The steady-state windows of one load step
+class StepResult:
+    def __init__(self, operation, mode, load, windows, stable, total_windows):
+        self.operation = operation
+        self.mode = mode
+        self.load = load
+        self.stable = stable
+        self.windows = total_windows
+        self.latency = PhaseResult(f"{operation}@{load:g}", load if mode == 'concurrency' else 0)
+        for window in windows:
+            self.latency.merge(window)
+        self.latency.concurrency = load if mode == 'concurrency' else 0
+        self.latency.elapsed = sum(window.elapsed for window in windows)
+        self.p99 = self.latency.histogram.value_at_percentile(99.0)
+
+    @property
+    def throughput(self):
+        return self.latency.throughput
+
+    @property
+    def error_rate(self):
+        return self.latency.errors / self.latency.count if self.latency.count else 1.0
+
+    def as_row(self):
+        percentiles = self.latency.histogram.percentiles((50.0, 99.0))
+        return {
+            'Endpoint': self.operation,
+            'Mode': self.mode,
+            'Load': self.load,
+            'Windows': self.windows,
+            'Stable': self.stable,
+            'Requests': self.latency.count,
+            'Errors': self.latency.errors,
+            'Mean Time (s)': self.latency.mean_time,
+            'p50 Time (s)': percentiles[50.0],
+            'p99 Time (s)': percentiles[99.0],
+            'Throughput (ops/s)': self.throughput,
+        }
+
+
+class SaturationRamp:
+    def __init__(self, operation, endpoint=ENDPOINT, mode='concurrency', start=1, factor=2.0, max_load=256,
+                 window=1.0, min_windows=3, max_windows=15, tolerance=0.1, connections=64,
+                 initial_objects=100, seed=None, writer=None):
+        kind, _, target = operation.partition(':')
+        if kind in DRAINING_KINDS:
+            raise ValueError(f"'{operation}' drains its own targets and cannot be held at a steady load")
+        if mode not in ('concurrency', 'rate'):
+            raise ValueError("mode must be 'concurrency' or 'rate'")
+        if factor <= 1:
+            raise ValueError("factor must be greater than 1")
+        self.driver = WorkloadDriver(WorkloadProfile(operation, [(kind, target, 1)]), endpoint,
+                                     initial_objects=initial_objects, seed=seed)
+        self.operation = self.driver.profile.operations[0]
+        self.mode = mode
+        self.start = start
+        self.factor = factor
+        self.max_load = max_load
+        self.window = window
+        self.min_windows = min_windows
+        self.max_windows = max(max_windows, min_windows)
+        self.tolerance = tolerance
+        self.connections = connections
+        self.writer = writer
+        self.current = None
+        self.steps = []
+        self.knee = None
+
+    def next_load(self, load):
+        if self.mode == 'concurrency':
+            return max(load + 1, round(load * self.factor))
+        return load * self.factor
+
+    async def send(self, connection, intended_time):
+        request = self.driver.build_request(self.operation)
+        if request is None:
+            await asyncio.sleep(0)
+            return
+        method, path, body, callback = request
+        status, headers, response = await connection.request(method, path, body, JSON_HEADERS)
+        self.current.add(time.perf_counter() - intended_time, status < 400)
+        if callback:
+            callback(status, response)
+
+    # Closed loop: one connection sending back to back
+    async def worker(self, stop):
+        connection = AsyncConnection(self.driver.host, self.driver.port)
+        try:
+            while not stop.is_set():
+                await self.send(connection, time.perf_counter())
+        finally:
+            await connection.close()
+
+    async def fire(self, pool, intended_time):
+        connection = await pool.get()
+        try:
+            await self.send(connection, intended_time)
+        finally:
+            pool.put_nowait(connection)
+
+    # Open loop: requests scheduled at `rate` whether or not earlier ones have
+    # answered; time waiting for a free connection counts towards latency
+    async def offer(self, rate, stop):
+        pool = asyncio.Queue()
+        connections = [AsyncConnection(self.driver.host, self.driver.port) for i in range(self.connections)]
+        for connection in connections:
+            pool.put_nowait(connection)
+        tasks = set()
+        period = 1.0 / rate
+        start_time = time.perf_counter()
+        sent = 0
+        try:
+            while not stop.is_set():
+                intended_time = start_time + sent * period
+                sent += 1
+                # Always yield, even when behind schedule, so the step can end
+                await asyncio.sleep(max(intended_time - time.perf_counter(), 0))
+                task = asyncio.ensure_future(self.fire(pool, intended_time))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            for connection in connections:
+                await connection.close()
+
+    # Hold the load in windows until the last `min_windows` mean latencies
+    # agree within `tolerance`, or `max_windows` have passed
+    async def hold(self, load, stop):
+        recent = collections.deque(maxlen=self.min_windows)
+        windows = 0
+        stable = False
+        self.current = PhaseResult(self.operation.name, load)
+        window_start = time.perf_counter()
+        try:
+            while windows < self.max_windows and not stable:
+                await asyncio.sleep(self.window)
+                now = time.perf_counter()
+                finished, self.current = self.current, PhaseResult(self.operation.name, load)
+                finished.elapsed, window_start = now - window_start, now
+                recent.append(finished)
+                windows += 1
+                means = [window.mean_time for window in recent]
+                if len(recent) == self.min_windows and all(window.count for window in recent):
+                    average = sum(means) / len(means)
+                    stable = max(means) - min(means) <= self.tolerance * average
+        finally:
+            stop.set()
+        return StepResult(self.operation.name, self.mode, load, recent, stable, windows)
+
+    async def run_step(self, load):
+        stop = asyncio.Event()
+        if self.mode == 'concurrency':
+            load_tasks = [asyncio.ensure_future(self.worker(stop)) for i in range(load)]
+        else:
+            load_tasks = [asyncio.ensure_future(self.offer(load, stop))]
+        try:
+            return await self.hold(load, stop)
+        finally:
+            stop.set()
+            await asyncio.gather(*load_tasks)
+
+    def past_knee(self, step):
+        if step.error_rate > MAX_ERROR_RATE:
+            return True
+        first = self.steps[0]
+        exploded = step is not first and step.p99 > LATENCY_FACTOR * first.p99
+        if self.mode == 'rate' and not step.stable and exploded:
+            # The queue kept growing for the whole hold
+            return True
+        if len(self.steps) < 2:
+            return False
+        previous = self.steps[-2]
+        gained = step.throughput / previous.throughput - 1 if previous.throughput else 0.0
+        plateau = gained < PLATEAU_EFFICIENCY * (step.load / previous.load - 1)
+        return plateau and exploded
+
+    def report(self, step):
+        if self.writer:
+            self.writer.write(step.as_row())
+        print(f"{step.operation:<26} {self.mode} {step.load:>8g}: {step.throughput:9.1f} req/s, "
+              f"mean {step.latency.mean_time * 1000:8.2f} ms, p99 {step.p99 * 1000:8.2f} ms, "
+              f"errors {step.latency.errors}, {step.windows} windows{'' if step.stable else ' (unstable)'}")
+
+    async def cleanup(self):
+        connection = AsyncConnection(self.driver.host, self.driver.port)
+        try:
+            for entity in self.driver.profile.entities():
+                for id in self.driver.ids[entity.name]:
+                    await connection.request('DELETE', entity.instance_url(id, self.driver.base_path), None,
+                                             JSON_HEADERS)
+        finally:
+            await connection.close()
+
+    async def run_async(self):
+        await self.driver.populate()
+        try:
+            load = self.start
+            while load <= self.max_load:
+                step = await self.run_step(load)
+                self.steps.append(step)
+                self.report(step)
+                if self.past_knee(step):
+                    self.knee = step
+                    break
+                load = self.next_load(load)
+        finally:
+            await self.cleanup()
+        return self.max_sustainable()
+
+    def run(self):
+        return asyncio.run(self.run_async())
+
+    # The best step before the knee, or None if even the first step failed it
+    def max_sustainable(self):
+        sustainable = [step for step in self.steps if step is not self.knee]
+        return max(sustainable, key=lambda step: step.throughput) if sustainable else None
+
+    def summary(self):
+        best = self.max_sustainable()
+        name = self.operation.name
+        if best is None:
+            return f"{name}: saturated at the first step ({self.mode} {self.steps[0].load:g})"
+        line = (f"{name}: max sustainable {best.throughput:.1f} req/s at {self.mode} {best.load:g} "
+                f"(p99 {best.p99 * 1000:.2f} ms)")
+        if self.knee:
+            return line + (f", knee at {self.mode} {self.knee.load:g}: {self.knee.throughput:.1f} req/s, "
+                           f"p99 {self.knee.p99 * 1000:.2f} ms")
+        return line + f", no knee below {self.mode} {self.max_load:g}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Step the load up until each endpoint saturates")
+    parser.add_argument('--operations', default=','.join(DEFAULT_OPERATIONS),
+                        help="comma-separated endpoints as kind:target, e.g. get:todos,related:todos/categories")
+    parser.add_argument('--mode', choices=('concurrency', 'rate'), default='concurrency')
+    parser.add_argument('--start', type=float, default=None, help="first step (default 1 connection or 50 req/s)")
+    parser.add_argument('--factor', type=float, default=2.0, help="load multiplier between steps")
+    parser.add_argument('--max-load', type=float, default=None,
+                        help="last step (default 256 connections or 20000 req/s)")
+    parser.add_argument('--window', type=float, default=1.0, help="seconds per measurement window")
+    parser.add_argument('--min-windows', type=int, default=3, help="steady windows required per step")
+    parser.add_argument('--max-windows', type=int, default=15,
+                        help="give up waiting for a steady state after this many")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="allowed relative spread of window mean latencies")
+    parser.add_argument('--connections', type=int, default=64, help="connection pool size in rate mode")
+    parser.add_argument('--initial-objects', type=int, default=100)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--results', help="stream one row per step to this .csv/.jsonl/.arrow file")
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    concurrency = args.mode == 'concurrency'
+    start = args.start or (1 if concurrency else 50.0)
+    max_load = args.max_load or (256 if concurrency else 20000.0)
+    if concurrency:
+        start, max_load = int(start), int(max_load)
+    writer = open_results_writer(args.results) if args.results else None
+    ramps = []
+    try:
+        for operation in args.operations.split(','):
+            ramp = SaturationRamp(operation, args.endpoint, args.mode, start, args.factor, max_load, args.window,
+                                  args.min_windows, args.max_windows, args.tolerance, args.connections,
+                                  args.initial_objects, args.seed, writer)
+            ramp.run()
+            ramps.append(ramp)
+    finally:
+        if writer:
+            writer.close()
+    for ramp in ramps:
+        print(ramp.summary())
+    if args.save:
+        record = RunRecord(dict(vars(args), driver='SaturationRamp', max_sustainable={
+            ramp.operation.name: ramp.max_sustainable().throughput if ramp.max_sustainable() else None
+            for ramp in ramps}))
+        for ramp in ramps:
+            for step in ramp.steps:
+                record.add_series(ramp.operation.name, step.latency.histogram, step.throughput, bucket=step.load)
+        record.save(args.save)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import time
+import psutil
+import requests
+from ServerMetrics import DEFAULT_JAR, SERVER_PORT, ServerMonitor, find_server_process, launch_server
+
+# Owns the thingifier for an unattended run: starts the jar (or adopts a
+# server already listening on the port), waits for readiness once with
+# exponential backoff, and answers health checks over one pooled
+# requests.Session instead of a new connection per check. Only a server this
+# object launched is stopped on exit.
+#
+#   with ServerLifecycle(jar_path) as server:
+#       engine = LoadEngine(TODOS, client=server.session, server_monitor=server.monitor())
+
+
+class ServerLifecycle:
+    def __init__(self, jar_path=DEFAULT_JAR, port=SERVER_PORT, java='java', startup_timeout=60.0, session=None):
+        self.jar_path = jar_path
+        self.port = port
+        self.java = java
+        self.startup_timeout = startup_timeout
+        self.endpoint = f"http://localhost:{port}/"
+        self.session = session or requests.Session()
+        self.process = None
+        # True when this object started the server and so must stop it
+        self.owned = False
+
+    def is_healthy(self, timeout=1.0):
+        try:
+            return self.session.get(self.endpoint, timeout=timeout).status_code == 200
+        except requests.RequestException:
+            return False
+
+    # Start the jar unless a server already answers on the port
+    def launch(self):
+        if self.process is not None and self.process.is_running():
+            return self
+        if self.is_healthy():
+            self.process = find_server_process(self.port, self.jar_path)
+            self.owned = False
+        else:
+            self.process = self.spawn()
+            self.owned = True
+        return self
+
+    def spawn(self):
+        return launch_server(self.jar_path, self.port, self.java)
+
+    def wait_until_ready(self, timeout=None):
+        timeout = self.startup_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        while not self.is_healthy():
+            if self.owned and self.process.poll() is not None:
+                raise RuntimeError(f"thingifier exited with code {self.process.returncode} during startup "
+                                   f"(java -jar {self.jar_path})")
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"thingifier not ready on port {self.port} after {timeout:g}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        return self
+
+    def start(self):
+        return self.launch().wait_until_ready()
+
+    def stop(self, timeout=10.0):
+        if self.owned and self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except psutil.TimeoutExpired:
+                self.process.kill()
+                self.process.wait(timeout)
+        self.process = None
+        self.owned = False
+
+    # Restarts even an adopted server: it is asked to exit through /shutdown
+    # and replaced by one this object owns
+    def restart(self):
+        if self.owned:
+            self.stop()
+        elif self.is_healthy():
+            try:
+                self.session.get(self.endpoint + 'shutdown', timeout=1.0)
+            except requests.RequestException:
+                pass
+            deadline = time.monotonic() + self.startup_timeout
+            while self.is_healthy(timeout=0.2) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.process = None
+        return self.start()
+
+    # ServerMonitor for the running server, or None if its process is not visible
+    def monitor(self):
+        if self.process is None:
+            return None
+        try:
+            return ServerMonitor(self.process)
+        except psutil.Error:
+            return None
+
+    def close(self):
+        self.stop()
+        self.session.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
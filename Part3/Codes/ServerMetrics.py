@@ -0,0 +1,95 @@
+import collections
+import subprocess
+import time
+import psutil
+
+MEGABYTE = 1024 * 1024
+
+DEFAULT_JAR = "runTodoManagerRestAPI-1.5.5.jar"
+SERVER_PORT = 4567
+
+# One observation of the thingifier process itself, on the perf_counter clock
+ServerSample = collections.namedtuple(
+    'ServerSample', ['time', 'rss_mb', 'cpu_time', 'cpu_percent', 'threads', 'open_files'])
+
+
+# Find the process listening on `port` (the thingifier by default). Falls back
+# to matching a java command line mentioning the jar when connection
+# information is not visible to this user.
+def find_server_process(port=SERVER_PORT, jar_name=DEFAULT_JAR):
+    try:
+        for connection in psutil.net_connections(kind='tcp'):
+            if connection.status == psutil.CONN_LISTEN and connection.laddr and connection.laddr.port == port:
+                if connection.pid:
+                    return psutil.Process(connection.pid)
+    except psutil.AccessDenied:
+        pass
+    for process in psutil.process_iter(['name', 'cmdline']):
+        cmdline = process.info['cmdline'] or []
+        if any(jar_name in part for part in cmdline):
+            return process
+    return None
+
+
+# Start the thingifier jar as a child process that the harness owns
+def launch_server(jar_path=DEFAULT_JAR, port=SERVER_PORT, java='java'):
+    args = [java, '-jar', jar_path]
+    if port != SERVER_PORT:
+        args.append(f"-port={port}")
+    return psutil.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+# Samples the server process's own RSS, CPU time, thread count and open file
+# descriptors. Pass sample() to ResourceSampler to record it in the
+# background alongside the latency measurements.
+class ServerMonitor:
+    def __init__(self, process):
+        if not isinstance(process, psutil.Process):
+            process = psutil.Process(process)
+        self.process = process
+        # Prime cpu_percent so the first sample covers the first period
+        self.process.cpu_percent()
+
+    @classmethod
+    def locate(cls, port=SERVER_PORT, jar_name=DEFAULT_JAR):
+        process = find_server_process(port, jar_name)
+        if process is None:
+            raise RuntimeError(f"No thingifier process found on port {port}")
+        return cls(process)
+
+    def open_file_count(self):
+        try:
+            return self.process.num_fds()
+        except AttributeError:
+            # Windows has handles instead of descriptors
+            return self.process.num_handles()
+
+    # None once the server has exited or cannot be read (e.g. AccessDenied
+    # for a server adopted from another user), so a sampler thread survives
+    def sample(self):
+        process = self.process
+        try:
+            return self.read_sample(process)
+        except psutil.Error:
+            return None
+
+    def read_sample(self, process):
+        with process.oneshot():
+            cpu_times = process.cpu_times()
+            return ServerSample(
+                time.perf_counter(),
+                process.memory_info().rss / MEGABYTE,
+                cpu_times.user + cpu_times.system,
+                process.cpu_percent(),
+                process.num_threads(),
+                self.open_file_count(),
+            )
+
+
+# ServerMonitor for the running thingifier, or None if it cannot be found
+def find_server_monitor(port=SERVER_PORT, jar_name=DEFAULT_JAR):
+    try:
+        process = find_server_process(port, jar_name)
+        return ServerMonitor(process) if process else None
+    except psutil.Error:
+        return None
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+from LoadEngine import ENDPOINT, ENTITIES, STRING
+from AsyncHttpClient import split_endpoint
+from FormatBenchmark import FormatDriver
+from RunRecord import RunRecord
+from ResultsWriter import open_results_writer
+from ServerMetrics import find_server_monitor
+
+# Sweeps the size of string fields (description by default) from bytes to
+# megabytes. At each size it creates objects, reads them back by id and
+# updates them, recording latency, throughput in MB/s and how much the
+# server's RSS grew per object stored. It then fits latency against body
+# size to get the per-KB cost of each operation and flags size cliffs, where
+# going one size up costs far more per byte than the sizes before it.
+#
+# The number of objects per size shrinks so that no size sends more than
+# `byte_budget` bytes of bodies (and the harness never holds more than that).
+# The budget is a hard cap: when it leaves fewer objects than `concurrency`,
+# that size runs with one connection per object, and a size whose single
+# object would exceed the budget is skipped.
+
+DEFAULT_SIZES = (16, 256, 4 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024)
+SWEEP_OPERATIONS = ('POST', 'GET', 'PUT')
+# A step whose marginal cost per byte is this many times the median is a cliff
+CLIFF_FACTOR = 3.0
+MEGABYTE = 1024 * 1024
+
+
+def least_squares(points):
+    n = len(points)
+    if n < 2:
+        return 0.0, points[0][1] if points else 0.0
+    mean_x = sum(x for x, y in points) / n
+    mean_y = sum(y for x, y in points) / n
+    variance = sum((x - mean_x) ** 2 for x, y in points)
+    if not variance:
+        return 0.0, mean_y
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+    return slope, mean_y - slope * mean_x
+
+
+class SizeSweep:
+    def __init__(self, entity, endpoint=ENDPOINT, fields=('description',), objects=500, concurrency=8,
+                 byte_budget=64 * MEGABYTE, seed=0, writer=None):
+        if isinstance(entity, str):
+            entity = ENTITIES[entity]
+        for field in fields:
+            if entity.fields.get(field, (None,))[0] != STRING:
+                raise ValueError(f"{entity.name} has no string field '{field}'")
+        self.entity = entity
+        self.endpoint = endpoint
+        self.fields = fields
+        self.objects = objects
+        self.concurrency = concurrency
+        self.byte_budget = byte_budget
+        self.seed = seed
+        self.writer = writer
+        host, port, base_path = split_endpoint(endpoint)
+        self.monitor = find_server_monitor(port)
+        # (size, operation) -> row
+        self.rows = {}
+        self.histograms = {}
+
+    # (objects, concurrency) for one size
+    def load_for(self, size):
+        count = min(self.objects, self.byte_budget // (2 * size * len(self.fields)))
+        return count, min(self.concurrency, count)
+
+    def server_rss(self):
+        sample = self.monitor.sample() if self.monitor else None
+        return sample.rss_mb if sample else None
+
+    async def measure(self, size):
+        count, concurrency = self.load_for(size)
+        if not count:
+            print(f"{size:>9} B skipped: one object's POST and PUT bodies exceed the {self.byte_budget} byte budget")
+            return
+        driver = FormatDriver(self.entity, 'json', self.endpoint, concurrency, count, self.seed,
+                              {field: size for field in self.fields})
+        body_bytes = len(driver.corpus.data) / len(driver.corpus)
+        rss_before = self.server_rss()
+        results = {}
+        try:
+            for operation in SWEEP_OPERATIONS:
+                results[operation] = await driver.run_phase(operation, count)
+            rss_after = self.server_rss()
+        finally:
+            await driver.run_phase('DELETE', len(driver.created_ids))
+        stored = results['POST'].latency.count - results['POST'].latency.errors
+        rss_per_object = None
+        if rss_before is not None and rss_after is not None and stored:
+            rss_per_object = (rss_after - rss_before) * 1024 / stored
+
+        for operation, result in results.items():
+            latency = result.latency
+            percentiles = latency.histogram.percentiles((50.0, 99.0))
+            moved = result.request_bytes + result.response_bytes
+            row = {
+                'Field Size (bytes)': size,
+                'Body Size (bytes)': body_bytes,
+                'Operation': operation,
+                'Objects': count,
+                'Concurrency': concurrency,
+                'Errors': latency.errors,
+                'Mean Time (s)': latency.mean_time,
+                'p50 Time (s)': percentiles[50.0],
+                'p99 Time (s)': percentiles[99.0],
+                'Throughput (ops/s)': latency.throughput,
+                'Throughput (MB/s)': moved / latency.elapsed / MEGABYTE if latency.elapsed else 0.0,
+                'Server RSS per Object (KB)': rss_per_object,
+            }
+            self.rows[(size, operation)] = row
+            self.histograms[(size, operation)] = latency.histogram
+            if self.writer:
+                self.writer.write(row)
+            print(f"{size:>9} B {operation:<4} x{count:<6} c{concurrency:<3} mean {latency.mean_time * 1000:8.2f} ms, "
+                  f"p99 {percentiles[99.0] * 1000:8.2f} ms, {latency.throughput:8.1f} req/s, "
+                  f"{row['Throughput (MB/s)']:7.2f} MB/s"
+                  + (f", RSS {rss_per_object:.1f} KB/object" if rss_per_object is not None else ''))
+
+    async def run_async(self, sizes=DEFAULT_SIZES):
+        for size in sorted(sizes):
+            await self.measure(size)
+        return self.rows
+
+    def run(self, sizes=DEFAULT_SIZES):
+        return asyncio.run(self.run_async(sizes))
+
+    # Per operation: (slope in seconds per KB of body, intercept, cliff sizes)
+    def analyse(self):
+        analysis = {}
+        for operation in SWEEP_OPERATIONS:
+            points = sorted((row['Body Size (bytes)'] / 1024, row['Mean Time (s)'])
+                            for (size, row_operation), row in self.rows.items() if row_operation == operation)
+            if not points:
+                continue
+            slope, intercept = least_squares(points)
+            marginal = [((y2 - y1) / (x2 - x1), x2) for (x1, y1), (x2, y2) in zip(points, points[1:]) if x2 > x1]
+            cliffs = []
+            if len(marginal) >= 2:
+                costs = sorted(cost for cost, x in marginal)
+                median = costs[len(costs) // 2]
+                cliffs = [x * 1024 for cost, x in marginal if median > 0 and cost > CLIFF_FACTOR * median]
+            analysis[operation] = (slope, intercept, cliffs)
+        return analysis
+
+    def print_analysis(self):
+        for operation, (slope, intercept, cliffs) in self.analyse().items():
+            line = f"{operation:<4} {intercept * 1000:.2f} ms + {slope * 1e6:.2f} us/KB"
+            if cliffs:
+                line += ", cliff at " + ', '.join(f"{int(size)} B bodies" for size in cliffs)
+            print(line)
+
+    def run_record(self, meta=None):
+        record = RunRecord(dict({'driver': 'SizeSweep', 'entity': self.entity.name}, **(meta or {})))
+        for (size, operation), histogram in self.histograms.items():
+            record.add_series(operation, histogram, self.rows[(size, operation)]['Throughput (ops/s)'], bucket=size)
+        return record
+
+
+def parse_size(text):
+    units = {'k': 1024, 'm': MEGABYTE}
+    text = text.strip().lower().rstrip('b')
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, throughput and server memory against field size")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--sizes', default='16,256,4k,64k,256k,1m', help="comma-separated field sizes, k/m suffixes")
+    parser.add_argument('--fields', default='description', help="comma-separated string fields to grow")
+    parser.add_argument('--objects', type=int, default=500, help="objects per size, before the byte budget")
+    parser.add_argument('--budget', default='64m', help="max POST+PUT body bytes generated per size")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--results', help="stream rows to this .csv/.jsonl/.arrow file")
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    writer = open_results_writer(args.results) if args.results else None
+    try:
+        sweep = SizeSweep(args.entity, args.endpoint, args.fields.split(','), args.objects, args.concurrency,
+                          parse_size(args.budget), args.seed, writer)
+        sweep.run([parse_size(size) for size in args.sizes.split(',')])
+    finally:
+        if writer:
+            writer.close()
+    sweep.print_analysis()
+    if args.save:
+        sweep.run_record(vars(args)).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
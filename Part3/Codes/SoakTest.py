@@ -0,0 +1,308 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from LoadEngine import ENDPOINT, ENTITIES
+from AsyncHttpClient import AsyncConnection
+from AsyncDriver import AsyncLoadDriver, PhaseResult
+from ResourceSampler import ResourceSampler
+from RunRecord import RunRecord
+from ResultsWriter import open_results_writer
+from ServerMetrics import find_server_monitor
+
+# Soak mode: hours of steady churn to expose slow server leaks. After
+# creating a population of objects, every worker loops over
+#
+#   POST a new object, PUT a random live object, DELETE a random live object
+#
+# so the number of live objects stays constant. The server's RSS is sampled
+# in the background and, after a warm-up, fitted to a trend line. If memory
+# keeps growing while the object count stays flat, the run is flagged as a
+# suspected leak.
+#
+# Harness memory does not grow with the duration: latencies go into one
+# HdrHistogram per operation, each reporting window is written out and
+# dropped, the RSS sample buffer is bounded and the trend line is fitted
+# from running sums.
+
+CHURN_OPERATIONS = ('POST', 'PUT', 'DELETE')
+# The object count counts as flat if it drifts less than this fraction of the
+# population, or than the concurrency: every in-flight POST or DELETE moves
+# the instantaneous count by one
+FLAT_DRIFT = 0.05
+# Below this r^2 the RSS samples are noise (GC sawtooth) rather than a trend
+MIN_R_SQUARED = 0.5
+
+
+# Online least-squares line over (x, y) points in O(1) memory
+class TrendLine:
+    def __init__(self):
+        self.count = 0
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_xy = self.sum_yy = 0.0
+        self.first = self.last = None
+
+    def add(self, x, y):
+        self.count += 1
+        self.sum_x += x
+        self.sum_y += y
+        self.sum_xx += x * x
+        self.sum_xy += x * y
+        self.sum_yy += y * y
+        if self.first is None:
+            self.first = (x, y)
+        self.last = (x, y)
+
+    def variances(self):
+        n = self.count
+        return (n * self.sum_xx - self.sum_x ** 2, n * self.sum_yy - self.sum_y ** 2,
+                n * self.sum_xy - self.sum_x * self.sum_y)
+
+    @property
+    def slope(self):
+        var_x, var_y, covariance = self.variances()
+        return covariance / var_x if self.count > 1 and var_x > 0 else 0.0
+
+    @property
+    def intercept(self):
+        return (self.sum_y - self.slope * self.sum_x) / self.count if self.count else 0.0
+
+    @property
+    def r_squared(self):
+        var_x, var_y, covariance = self.variances()
+        if self.count < 3 or var_x <= 0 or var_y <= 0:
+            return 0.0
+        return covariance * covariance / (var_x * var_y)
+
+    @property
+    def span(self):
+        return self.last[0] - self.first[0] if self.count else 0.0
+
+
+def parse_duration(text):
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    text = text.strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+class SoakTest(AsyncLoadDriver):
+    def __init__(self, entity, endpoint=ENDPOINT, population=1000, concurrency=8, duration=3600.0,
+                 interval=60.0, warmup=300.0, sample_period=5.0, leak_threshold=5.0, seed=None,
+                 writer=None, server_monitor=None, flat_drift=FLAT_DRIFT):
+        super().__init__(entity, endpoint, concurrency, seed=seed)
+        if warmup >= duration:
+            raise ValueError("warmup must be shorter than the duration")
+        self.population = population
+        self.duration = duration
+        self.interval = interval
+        self.warmup = warmup
+        self.leak_threshold = leak_threshold
+        self.flat_drift = flat_drift
+        self.writer = writer
+        self.monitor = server_monitor or find_server_monitor(self.port)
+        self.sampler = None
+        if self.monitor:
+            # Room for two windows of samples; older ones have already been fitted
+            self.sampler = ResourceSampler(sample_period, int(2 * interval / sample_period) + 10, self.monitor.sample)
+        self.window = self.new_window()
+        # Whole-run latency per operation; fixed size however long the run
+        self.totals = {operation: PhaseResult(operation, concurrency) for operation in CHURN_OPERATIONS}
+        self.rss_trend = TrendLine()
+        self.count_trend = TrendLine()
+        self.start_time = self.window_start = None
+        self.last_sample_time = 0.0
+        self.stopping = False
+
+    def new_window(self):
+        return {operation: PhaseResult(operation, self.concurrency) for operation in CHURN_OPERATIONS}
+
+    async def send(self, connection, operation):
+        path, body = self.next_request(operation)
+        if path is None:
+            return
+        start_time = time.perf_counter()
+        status, headers, response_body = await connection.request(operation, path, body, self.headers)
+        self.window[operation].add(time.perf_counter() - start_time, status < 400)
+        if operation == 'POST' and status == 201:
+            self.created_ids.add(json.loads(response_body)['id'])
+
+    async def churn(self):
+        connection = AsyncConnection(self.host, self.port)
+        try:
+            while not self.stopping:
+                for operation in CHURN_OPERATIONS:
+                    await self.send(connection, operation)
+        finally:
+            await connection.close()
+
+    # The server's own count of live objects, so failed deletes show up
+    async def server_count(self, connection):
+        status, headers, body = await connection.request('GET', self.entity.collection_url(self.base_path),
+                                                         None, self.headers)
+        return len(json.loads(body)[self.entity.name]) if status == 200 else None
+
+    def fit_samples(self):
+        if self.sampler is None:
+            return None
+        latest = None
+        # list() copies the deque in one step while the sampler thread appends
+        for sample in list(self.sampler.samples):
+            if sample.time <= self.last_sample_time:
+                continue
+            self.last_sample_time = sample.time
+            latest = sample
+            elapsed = sample.time - self.start_time
+            if elapsed >= self.warmup:
+                self.rss_trend.add(elapsed / 3600, sample.rss_mb)
+        return latest
+
+    def report(self, object_count):
+        window, self.window = self.window, self.new_window()
+        now = time.perf_counter()
+        elapsed = now - self.start_time
+        window_time, self.window_start = now - self.window_start, now
+        sample = self.fit_samples()
+        rss = sample.rss_mb if sample else None
+        if object_count is not None and elapsed >= self.warmup:
+            self.count_trend.add(elapsed / 3600, object_count)
+        for operation, result in window.items():
+            result.elapsed = window_time
+            self.totals[operation].merge(result)
+            percentiles = result.histogram.percentiles((50.0, 99.0))
+            row = {
+                'Elapsed (s)': round(elapsed, 1),
+                'Operation': operation,
+                'Requests': result.count,
+                'Errors': result.errors,
+                'Mean Time (s)': result.mean_time,
+                'p50 Time (s)': percentiles[50.0],
+                'p99 Time (s)': percentiles[99.0],
+                'Throughput (ops/s)': result.throughput,
+                'Objects': object_count,
+                'Server RSS (MB)': rss,
+            }
+            if self.writer:
+                self.writer.write(row)
+        post = window['POST']
+        print(f"{elapsed / 60:7.1f} min: {post.throughput * len(CHURN_OPERATIONS):8.1f} req/s, "
+              f"p99 POST {post.histogram.value_at_percentile(99.0) * 1000:.2f} ms, "
+              f"objects {object_count}, RSS {'n/a' if rss is None else f'{rss:.1f} MB'}, "
+              f"errors {sum(result.errors for result in window.values())}")
+
+    async def run_async(self):
+        setup = await self.run_phase('POST', self.population)
+        print(f"Populated {len(self.created_ids)} {self.entity.name}: {setup}")
+        connection = AsyncConnection(self.host, self.port)
+        if self.sampler:
+            self.sampler.start()
+        self.start_time = self.window_start = time.perf_counter()
+        workers = [asyncio.ensure_future(self.churn()) for i in range(self.concurrency)]
+        try:
+            end_time = self.start_time + self.duration
+            while time.perf_counter() < end_time:
+                await asyncio.sleep(min(self.interval, end_time - time.perf_counter()))
+                if any(worker.done() for worker in workers):
+                    break
+                self.report(await self.server_count(connection))
+        finally:
+            self.stopping = True
+            await asyncio.gather(*workers, return_exceptions=True)
+            elapsed = time.perf_counter() - self.start_time
+            if self.sampler:
+                self.sampler.stop()
+                self.fit_samples()
+            await connection.close()
+            await self.run_phase('DELETE', len(self.created_ids))
+        for worker in workers:
+            if not worker.cancelled() and worker.exception():
+                raise worker.exception()
+        for result in self.totals.values():
+            # merge() sums concurrency as if the windows were shards
+            result.concurrency = self.concurrency
+            result.elapsed = elapsed
+        return self.verdict()
+
+    def run(self):
+        return asyncio.run(self.run_async())
+
+    # Largest object count drift that still counts as flat
+    @property
+    def drift_limit(self):
+        return max(self.flat_drift * self.population, self.concurrency)
+
+    # (leak suspected, RSS growth in MB per hour, r^2 of the fit, object count drift)
+    def verdict(self):
+        trend = self.rss_trend
+        drift = abs(self.count_trend.slope * self.count_trend.span)
+        flat = drift <= self.drift_limit
+        # A steep slope over a few minutes is not evidence: the fitted growth
+        # must also reach what the threshold rate would add in an hour
+        grown = trend.slope * trend.span >= self.leak_threshold
+        leak = (trend.count >= 3 and flat and grown and trend.slope > self.leak_threshold
+                and trend.r_squared >= MIN_R_SQUARED)
+        return leak, trend.slope, trend.r_squared, drift
+
+    def print_verdict(self):
+        leak, slope, r_squared, drift = self.verdict()
+        for result in self.totals.values():
+            print(result)
+        if self.rss_trend.count < 3:
+            print("Not enough server RSS samples after warm-up to fit a trend")
+            return
+        print(f"Server RSS trend {slope:+.2f} MB/h (r^2 {r_squared:.2f}) over {self.rss_trend.span * 60:.1f} min "
+              f"after warm-up, object count drift {drift:.0f}")
+        if leak:
+            print(f"LEAK SUSPECTED: memory grows {slope:.2f} MB/h while the object count is flat")
+        elif drift > self.drift_limit:
+            print("Object count was not flat; memory growth cannot be attributed to a leak")
+
+    def run_record(self, meta=None):
+        leak, slope, r_squared, drift = self.verdict()
+        record = RunRecord(dict({'driver': 'SoakTest', 'entity': self.entity.name, 'leak_suspected': leak,
+                                 'rss_slope_mb_per_hour': slope, 'rss_r_squared': r_squared}, **(meta or {})))
+        for operation, result in self.totals.items():
+            record.add_series(operation, result.histogram, result.throughput)
+        return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Steady create/update/delete churn for hours with leak detection")
+    parser.add_argument('entity', choices=sorted(ENTITIES))
+    parser.add_argument('--duration', default='1h', help="e.g. 90s, 30m, 4h")
+    parser.add_argument('--warmup', default='5m', help="time excluded from the RSS trend fit")
+    parser.add_argument('--interval', default='60s', help="reporting window")
+    parser.add_argument('--sample-period', default='5s', help="server RSS sampling period")
+    parser.add_argument('--population', type=int, default=1000, help="live objects kept on the server")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--leak-threshold', type=float, default=5.0, help="MB/h of RSS growth flagged as a leak")
+    parser.add_argument('--flat-drift', type=float, default=FLAT_DRIFT,
+                        help="object count drift, as a fraction of the population, that still counts as flat "
+                             "(never below the concurrency)")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--results', help="stream one row per window and operation to .csv/.jsonl/.arrow")
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    writer = open_results_writer(args.results) if args.results else None
+    try:
+        soak = SoakTest(args.entity, args.endpoint, args.population, args.concurrency,
+                        parse_duration(args.duration), parse_duration(args.interval),
+                        parse_duration(args.warmup), parse_duration(args.sample_period),
+                        args.leak_threshold, args.seed, writer, flat_drift=args.flat_drift)
+        if soak.monitor is None:
+            print("Server process not found: running without RSS sampling or leak detection")
+        leak = soak.run()[0]
+    finally:
+        if writer:
+            writer.close()
+    soak.print_verdict()
+    if args.save:
+        soak.run_record(vars(args)).save(args.save)
+    sys.exit(1 if leak else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import xml.etree.ElementTree as ElementTree
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+from xml.sax.saxutils import escape
+from Entities import ENTITIES
+from AsyncHttpClient import read_request
+
+# In-process stand-in for the thingifier (runTodoManagerRestAPI-1.5.5.jar):
+# todos, projects and categories, their relationships, JSON and XML bodies,
+# and the quirks Part1/RestAPITester.py documents (string booleans, one-way
+# todo/category links, 4-header chunked responses). Everything lives in
+# dicts, so the server costs microseconds per request; add --latency and
+# --jitter to model a slower backend. Use it to measure the harness's own
+# ceiling, or to run the suites in CI without Java.
+#
+#   python StandInServer.py --port 4567 --latency 2 --jitter 1
+
+STRING = 'string'
+BOOLEAN = 'boolean'
+
+FIELDS = {
+    'todos': {'title': STRING, 'doneStatus': BOOLEAN, 'description': STRING},
+    'projects': {'title': STRING, 'completed': BOOLEAN, 'active': BOOLEAN, 'description': STRING},
+    'categories': {'title': STRING, 'description': STRING},
+}
+MANDATORY = {'todos': ('title',), 'projects': (), 'categories': ('title',)}
+
+# Relationships the thingifier keeps in sync in both directions. All others
+# (todos/categories and categories/todos, ...) are one-way.
+INVERSE = {
+    ('todos', 'tasksof'): ('projects', 'tasks'),
+    ('projects', 'tasks'): ('todos', 'tasksof'),
+}
+
+# Relationship names are accepted, and ignored, as body fields
+RELATIONSHIP_NAMES = {name for entity in ENTITIES.values() for name in entity.relationships}
+
+SERVER_HEADER = 'Jetty(9.4.z-SNAPSHOT)'
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class TodoStore:
+    def __init__(self, fixtures=True):
+        self.things = {name: {} for name in FIELDS}
+        # entity -> id -> relationship -> {target id: None} (an ordered set)
+        self.links = {name: {} for name in FIELDS}
+        # (entity, id) -> {(source entity, source id, relationship)} pointing at it
+        self.incoming = {}
+        self.next_id = {name: 1 for name in FIELDS}
+        if fixtures:
+            self.load_fixtures()
+
+    # The jar's start-up data
+    def load_fixtures(self):
+        self.create('projects', {'title': 'Office Work'})
+        self.create('categories', {'title': 'Office'})
+        self.create('categories', {'title': 'Home'})
+        self.create('todos', {'title': 'scan paperwork'})
+        self.create('todos', {'title': 'file paperwork'})
+        self.link('todos', '1', 'tasksof', '1')
+        self.link('todos', '2', 'tasksof', '1')
+        self.link('todos', '1', 'categories', '1')
+
+    def get(self, entity, id):
+        thing = self.things[entity].get(id)
+        if thing is None:
+            raise ApiError(404, f"Could not find an instance with {entity}/{id}")
+        return thing
+
+    def validate(self, entity, data, creating):
+        fields = FIELDS[entity]
+        values = {}
+        for key, value in data.items():
+            if key == 'id':
+                if creating:
+                    raise ApiError(400, "Invalid Creation: Failed Validation: Not allowed to create with id")
+                continue
+            if key in RELATIONSHIP_NAMES and key not in fields:
+                continue
+            kind = fields.get(key)
+            if kind is None:
+                raise ApiError(400, f"Could not find field: {key}")
+            if kind == BOOLEAN:
+                text = str(value).lower() if isinstance(value, (bool, str)) else None
+                if text not in ('true', 'false'):
+                    raise ApiError(400, f"Failed Validation: {key} should be BOOLEAN")
+                value = text
+            elif value is None:
+                value = ''
+            values[key] = str(value)
+        if creating:
+            for key in MANDATORY[entity]:
+                if not values.get(key):
+                    raise ApiError(400, f"{key} : field is mandatory")
+        return values
+
+    def create(self, entity, data):
+        values = self.validate(entity, data, creating=True)
+        id = str(self.next_id[entity])
+        self.next_id[entity] += 1
+        thing = {'id': id}
+        for key, kind in FIELDS[entity].items():
+            thing[key] = values.get(key, 'false' if kind == BOOLEAN else '')
+        self.things[entity][id] = thing
+        self.links[entity][id] = {}
+        return id
+
+    # POST /todos/:id amends the given fields; PUT replaces the whole object,
+    # including dropping its relationships
+    def update(self, entity, id, data, replace=False):
+        thing = self.get(entity, id)
+        values = self.validate(entity, data, creating=False)
+        if replace:
+            for key, kind in FIELDS[entity].items():
+                thing[key] = values.get(key, 'false' if kind == BOOLEAN else '')
+            for relationship, targets in list(self.links[entity][id].items()):
+                for target in list(targets):
+                    self.unlink(entity, id, relationship, target)
+        else:
+            thing.update(values)
+        return id
+
+    def delete(self, entity, id):
+        self.get(entity, id)
+        for relationship, targets in list(self.links[entity][id].items()):
+            for target in list(targets):
+                self.unlink(entity, id, relationship, target)
+        for source, source_id, relationship in list(self.incoming.pop((entity, id), ())):
+            self.remove_link(source, source_id, relationship, id)
+        del self.things[entity][id]
+        del self.links[entity][id]
+
+    def add_link(self, entity, id, relationship, target):
+        target_entity = ENTITIES[entity].relationships[relationship]
+        self.links[entity][id].setdefault(relationship, {})[target] = None
+        self.incoming.setdefault((target_entity, target), set()).add((entity, id, relationship))
+
+    def remove_link(self, entity, id, relationship, target):
+        target_entity = ENTITIES[entity].relationships[relationship]
+        targets = self.links[entity][id].get(relationship, {})
+        if target not in targets:
+            return False
+        del targets[target]
+        if not targets:
+            del self.links[entity][id][relationship]
+        self.incoming.get((target_entity, target), set()).discard((entity, id, relationship))
+        return True
+
+    def link(self, entity, id, relationship, target):
+        target_entity = ENTITIES[entity].relationships[relationship]
+        self.get(entity, id)
+        self.get(target_entity, target)
+        self.add_link(entity, id, relationship, target)
+        inverse = INVERSE.get((entity, relationship))
+        if inverse:
+            self.add_link(inverse[0], target, inverse[1], id)
+
+    def unlink(self, entity, id, relationship, target):
+        if not self.remove_link(entity, id, relationship, target):
+            raise ApiError(404, f"Could not find any instances with {entity}/{id}/{relationship}/{target}")
+        inverse = INVERSE.get((entity, relationship))
+        if inverse:
+            self.remove_link(inverse[0], target, inverse[1], id)
+
+    # Like the jar, an unknown source id lists nothing rather than failing
+    def related(self, entity, id, relationship):
+        target_entity = ENTITIES[entity].relationships[relationship]
+        targets = self.links[entity].get(id, {}).get(relationship, {})
+        return target_entity, [self.render(target_entity, target) for target in targets]
+
+    def render(self, entity, id):
+        thing = dict(self.things[entity][id])
+        for relationship, targets in self.links[entity][id].items():
+            thing[relationship] = [{'id': target} for target in targets]
+        return thing
+
+    def list(self, entity, filters=()):
+        things = self.things[entity].values()
+        if filters:
+            things = [thing for thing in things if all(thing.get(key) == value for key, value in filters)]
+        return [self.render(entity, thing['id']) for thing in things]
+
+
+def parse_body(body, content_type):
+    if not body or not body.strip():
+        return {}
+    try:
+        if 'xml' in content_type:
+            root = ElementTree.fromstring(body)
+            return {child.tag: (child.text or '').strip() for child in root}
+        data = json.loads(body)
+    except (ValueError, ElementTree.ParseError) as error:
+        raise ApiError(400, f"Could not parse the request body: {error}")
+    if not isinstance(data, dict):
+        raise ApiError(400, "Request body must be an object")
+    return data
+
+
+def encode_xml(value, tag):
+    if isinstance(value, dict):
+        return f"<{tag}>" + ''.join(encode_xml(item, key) for key, item in value.items()) + f"</{tag}>"
+    if isinstance(value, list):
+        # Collections are <todos><todo>...</todo></todos>, links
+        # <tasksof><id>1</id></tasksof>, errors <errorMessages><errorMessage>...
+        if tag in ENTITIES:
+            inner = ''.join(encode_xml(item, ENTITIES[tag].element) for item in value)
+        else:
+            inner = ''.join(encode_xml(item['id'], 'id') if isinstance(item, dict) else encode_xml(item, 'errorMessage')
+                            for item in value)
+        return f"<{tag}>{inner}</{tag}>"
+    return f"<{tag}>{escape(str(value))}</{tag}>"
+
+
+class StandInServer:
+    def __init__(self, latency=0.0, jitter=0.0, fixtures=True, seed=None):
+        self.store = TodoStore(fixtures)
+        # Seconds added to every response, plus uniform(0, jitter)
+        self.latency = latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.stopped = None
+        self.date_second = None
+        self.date_header = ''
+
+    def date(self):
+        now = int(time.time())
+        if now != self.date_second:
+            self.date_second = now
+            self.date_header = formatdate(now, usegmt=True)
+        return self.date_header
+
+    # (status, payload, element): payload is a dict to encode or None for no
+    # body; element names the XML root when payload is a single object
+    def route(self, method, target, headers, body):
+        path, _, query = target.partition('?')
+        segments = [segment for segment in path.split('/') if segment]
+        if not segments:
+            return 200, None, None
+        if segments == ['shutdown']:
+            self.stopped.set()
+            return 200, None, None
+        entity = segments[0]
+        if entity not in ENTITIES or len(segments) > 4:
+            raise ApiError(404, f"Could not find {path}")
+        store = self.store
+        if method == 'HEAD':
+            method = 'GET'
+        if len(segments) == 1:
+            if method == 'GET':
+                return 200, {entity: store.list(entity, parse_qsl(query))}, None
+            if method == 'POST':
+                id = store.create(entity, parse_body(body, headers.get('content-type', '')))
+                return 201, store.render(entity, id), ENTITIES[entity].element
+        elif len(segments) == 2:
+            id = segments[1]
+            if method == 'GET':
+                store.get(entity, id)
+                return 200, {entity: [store.render(entity, id)]}, None
+            if method in ('POST', 'PUT'):
+                store.update(entity, id, parse_body(body, headers.get('content-type', '')), method == 'PUT')
+                return 200, store.render(entity, id), ENTITIES[entity].element
+            if method == 'DELETE':
+                store.delete(entity, id)
+                return 200, None, None
+        else:
+            id, relationship = segments[1], segments[2]
+            if relationship not in ENTITIES[entity].relationships:
+                raise ApiError(404, f"Could not find {path}")
+            target_entity = ENTITIES[entity].relationships[relationship]
+            if len(segments) == 3 and method == 'GET':
+                target_entity, things = store.related(entity, id, relationship)
+                return 200, {target_entity: things}, None
+            if len(segments) == 3 and method == 'POST':
+                data = parse_body(body, headers.get('content-type', ''))
+                store.get(entity, id)
+                if 'id' in data:
+                    # Links an existing object; the other fields are ignored.
+                    # The jar only matches string ids: {"id": 1} finds nothing
+                    if not isinstance(data['id'], str):
+                        raise ApiError(404, "Could not find thing matching value for id")
+                    store.link(entity, id, relationship, data['id'])
+                    return 201, None, None
+                target = store.create(target_entity, data)
+                store.link(entity, id, relationship, target)
+                return 201, store.render(target_entity, target), ENTITIES[target_entity].element
+            if len(segments) == 4 and method == 'DELETE':
+                store.get(entity, id)
+                store.unlink(entity, id, relationship, segments[3])
+                return 200, None, None
+        return 405, None, None
+
+    def encode_response(self, method, status, payload, element, accept):
+        xml = 'xml' in accept and 'json' not in accept
+        if payload is None:
+            body = b''
+        elif xml:
+            if element is None:
+                (element, payload), = payload.items()
+            body = encode_xml(payload, element).encode()
+        else:
+            body = json.dumps(payload, separators=(',', ':')).encode()
+        head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                f"Date: {self.date()}\r\n"
+                f"Content-Type: {'application/xml' if xml else 'application/json'}\r\n"
+                "Transfer-Encoding: chunked\r\n"
+                f"Server: {SERVER_HEADER}\r\n\r\n").encode('latin-1')
+        if method == 'HEAD':
+            return head
+        if body:
+            return head + f"{len(body):x}\r\n".encode() + body + b"\r\n0\r\n\r\n"
+        return head + b"0\r\n\r\n"
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                self.requests += 1
+                try:
+                    status, payload, element = self.route(method, target, headers, body)
+                except ApiError as error:
+                    status, payload, element = error.status, {'errorMessages': [error.message]}, None
+                if self.latency or self.jitter:
+                    await asyncio.sleep(self.latency + self.random.random() * self.jitter)
+                writer.write(self.encode_response(method, status, payload, element, headers.get('accept', '')))
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled: idle keep-alive connections when the server stops
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='localhost', port=4567, ready=None):
+        self.stopped = asyncio.Event()
+        server = await asyncio.start_server(self.handle_client, host, port)
+        if ready is not None:
+            ready()
+        async with server:
+            await self.stopped.wait()
+
+    def run(self, host='localhost', port=4567):
+        asyncio.run(self.serve(host, port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Python stand-in for the thingifier todo manager API")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=4567)
+    parser.add_argument('--latency', type=float, default=0.0, help="milliseconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many extra random milliseconds")
+    parser.add_argument('--empty', action='store_true', help="start without the jar's fixture data")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = StandInServer(args.latency / 1000, args.jitter / 1000, not args.empty, args.seed)
+    print(f"Stand-in thingifier on http://{args.host}:{args.port}/ (GET /shutdown or Ctrl+C to stop)")
+    try:
+        server.run(args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+    print(f"{server.requests} requests served")
+
+
+if __name__ == '__main__':
+    main()
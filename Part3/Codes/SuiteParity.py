@@ -0,0 +1,79 @@
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import psutil
+from ServerMetrics import DEFAULT_JAR, SERVER_PORT
+from ServerLifecycle import ServerLifecycle
+from ParallelSuite import SUITE_PATH, ParallelSuiteRunner, collect_outcomes, suite_worker
+
+# Checks that StandInServer is a faithful stand-in for the jar: runs the
+# Part1 functional suite, in one fixed order, against a fresh jar and a fresh
+# stand-in and lists every test whose outcome differs. Exits 1 on any
+# difference, so a stand-in change that breaks parity fails loudly.
+#
+#   python SuiteParity.py --jar ../../runTodoManagerRestAPI-1.5.5.jar
+#
+# Servers already listening on either port are used as they are, so stop
+# them first to compare against fresh fixtures.
+
+STAND_IN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'StandInServer.py')
+
+
+# ServerLifecycle for StandInServer.py started with the current interpreter
+class StandInLifecycle(ServerLifecycle):
+    def __init__(self, port=SERVER_PORT + 100, startup_timeout=10.0):
+        super().__init__(STAND_IN_PATH, port, sys.executable, startup_timeout)
+
+    def spawn(self):
+        return psutil.Popen([self.java, self.jar_path, '--port', str(self.port)],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+# name -> (outcome, details) of a serial run of `names` on `server`
+def run_suite(server, names, suite_path=SUITE_PATH):
+    context = multiprocessing.get_context()
+    tests = context.Queue()
+    results = context.Queue()
+    for name in names:
+        tests.put(name)
+    tests.put(None)
+    with server:
+        process = context.Process(target=suite_worker, args=(suite_path, server.endpoint, tests, results))
+        process.start()
+        outcomes = collect_outcomes(results, [process], len(names))
+    return {name: (outcome, details) for name, endpoint, outcome, duration, details in outcomes}
+
+
+def compare_suites(jar_path=DEFAULT_JAR, jar_port=SERVER_PORT + 1, stand_in_port=SERVER_PORT + 100,
+                   suite_path=SUITE_PATH, seed=0):
+    names = ParallelSuiteRunner(suite_path=suite_path, seed=seed).test_names()
+    jar = run_suite(ServerLifecycle(jar_path, jar_port), names, suite_path)
+    stand_in = run_suite(StandInLifecycle(stand_in_port), names, suite_path)
+    missing = ('missing', '')
+    return [(name, jar.get(name, missing), stand_in.get(name, missing)) for name in names
+            if jar.get(name, missing)[0] != stand_in.get(name, missing)[0]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Part1 suite outcomes on the jar and the stand-in")
+    parser.add_argument('--jar', default=DEFAULT_JAR)
+    parser.add_argument('--jar-port', type=int, default=SERVER_PORT + 1)
+    parser.add_argument('--stand-in-port', type=int, default=SERVER_PORT + 100)
+    parser.add_argument('--suite', default=SUITE_PATH)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the shared test order")
+    args = parser.parse_args()
+
+    differences = compare_suites(args.jar, args.jar_port, args.stand_in_port, args.suite, args.seed)
+    for name, (jar_outcome, jar_details), (stand_in_outcome, stand_in_details) in differences:
+        print('=' * 70)
+        print(f"{name}: jar {jar_outcome}, stand-in {stand_in_outcome}")
+        print('-' * 70)
+        print(stand_in_details or jar_details)
+    print(f"{len(differences)} tests differ between the jar and the stand-in")
+    sys.exit(1 if differences else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import requests
+from LoadEngine import ENDPOINT
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+# Typed client for the thingifier. Every response body is decoded exactly
+# once (with orjson when it is installed) straight into __slots__ models, so
+# a list of 10,000 todos is 10,000 small objects with real booleans and
+# tuples of related ids rather than dicts of strings.
+#
+#   client = TodoClient()
+#   todo = client.todos.create(Todo(title='scan', done_status=False))
+#   client.todos.link(todo.id, 'categories', 1)
+#   [category.title for category in client.todos.related(todo.id, 'categories')]
+
+if orjson is not None:
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(value):
+        return orjson.dumps(value)
+else:
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(value):
+        return json.dumps(value, separators=(',', ':')).encode()
+
+STRING = 'string'
+BOOLEAN = 'boolean'
+
+
+class ApiError(Exception):
+    def __init__(self, status, messages):
+        super().__init__(f"{status}: {'; '.join(messages) or 'no error message'}")
+        self.status = status
+        self.messages = messages
+
+
+# FIELDS maps attribute -> (JSON key, kind); RELATIONSHIPS maps attribute ->
+# JSON key. Relationships hold a tuple of related ids.
+class Model:
+    __slots__ = ('id',)
+    FIELDS = {}
+    RELATIONSHIPS = {}
+    PATH = None
+
+    def __init__(self, id=None, **values):
+        self.id = id
+        for attribute, (key, kind) in self.FIELDS.items():
+            setattr(self, attribute, values.pop(attribute, False if kind == BOOLEAN else ''))
+        for attribute in self.RELATIONSHIPS:
+            setattr(self, attribute, tuple(values.pop(attribute, ())))
+        if values:
+            raise TypeError(f"{type(self).__name__} has no field {', '.join(values)}")
+
+    @classmethod
+    def from_json(cls, data):
+        model = cls.__new__(cls)
+        model.id = int(data['id'])
+        for attribute, (key, kind) in cls.FIELDS.items():
+            value = data.get(key, '')
+            setattr(model, attribute, (value == 'true' or value is True) if kind == BOOLEAN else value)
+        for attribute, key in cls.RELATIONSHIPS.items():
+            setattr(model, attribute, tuple(int(link['id']) for link in data.get(key, ())))
+        return model
+
+    # Request body: fields only, relationships are managed through link/unlink
+    def to_json(self):
+        return {key: getattr(self, attribute) for attribute, (key, kind) in self.FIELDS.items()}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in ('id',) + self.__slots__)
+
+    def __repr__(self):
+        values = ', '.join(f"{name}={getattr(self, name)!r}" for name in ('id',) + self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class Todo(Model):
+    __slots__ = ('title', 'done_status', 'description', 'tasksof', 'categories')
+    FIELDS = {'title': ('title', STRING), 'done_status': ('doneStatus', BOOLEAN),
+              'description': ('description', STRING)}
+    RELATIONSHIPS = {'tasksof': 'tasksof', 'categories': 'categories'}
+    PATH = 'todos'
+
+
+class Project(Model):
+    __slots__ = ('title', 'completed', 'active', 'description', 'tasks', 'categories')
+    FIELDS = {'title': ('title', STRING), 'completed': ('completed', BOOLEAN), 'active': ('active', BOOLEAN),
+              'description': ('description', STRING)}
+    RELATIONSHIPS = {'tasks': 'tasks', 'categories': 'categories'}
+    PATH = 'projects'
+
+
+class Category(Model):
+    __slots__ = ('title', 'description', 'todos', 'projects')
+    FIELDS = {'title': ('title', STRING), 'description': ('description', STRING)}
+    RELATIONSHIPS = {'todos': 'todos', 'projects': 'projects'}
+    PATH = 'categories'
+
+
+MODELS = {model.PATH: model for model in (Todo, Project, Category)}
+# Model returned by each relationship endpoint
+RELATED = {
+    ('todos', 'tasksof'): Project, ('todos', 'categories'): Category,
+    ('projects', 'tasks'): Todo, ('projects', 'categories'): Category,
+    ('categories', 'todos'): Todo, ('categories', 'projects'): Project,
+}
+
+
+# The endpoints of one entity type: client.todos, client.projects, client.categories
+class Resource:
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+        self.url = f"{client.endpoint}{model.PATH}"
+
+    # Filters use attribute names, e.g. list(done_status=True) -> ?doneStatus=true
+    def list(self, **filters):
+        params = {self.model.FIELDS[attribute][0]: str(value).lower() if isinstance(value, bool) else value
+                  for attribute, value in filters.items()}
+        data = self.client.call('GET', self.url, params=params or None)
+        return [self.model.from_json(item) for item in data[self.model.PATH]]
+
+    def get(self, id):
+        return self.model.from_json(self.client.call('GET', f"{self.url}/{id}")[self.model.PATH][0])
+
+    def create(self, model=None, **fields):
+        model = model or self.model(**fields)
+        return self.model.from_json(self.client.call('POST', self.url, model.to_json()))
+
+    # PUT: replaces every field (and, on the thingifier, drops relationships)
+    def replace(self, id, model):
+        return self.model.from_json(self.client.call('PUT', f"{self.url}/{id}", model.to_json()))
+
+    # POST /:id: changes only the given fields, e.g. amend(1, done_status=True)
+    def amend(self, id, **fields):
+        body = {self.model.FIELDS[attribute][0]: value for attribute, value in fields.items()}
+        return self.model.from_json(self.client.call('POST', f"{self.url}/{id}", body))
+
+    def delete(self, id):
+        self.client.call('DELETE', f"{self.url}/{id}")
+
+    def related(self, id, relationship):
+        related = RELATED[(self.model.PATH, relationship)]
+        data = self.client.call('GET', f"{self.url}/{id}/{relationship}")
+        return [related.from_json(item) for item in data[related.PATH]]
+
+    def link(self, id, relationship, target_id):
+        self.client.call('POST', f"{self.url}/{id}/{relationship}", {'id': str(target_id)})
+
+    # Create a new related object and link it in one request
+    def create_related(self, id, relationship, model):
+        related = RELATED[(self.model.PATH, relationship)]
+        return related.from_json(self.client.call('POST', f"{self.url}/{id}/{relationship}", model.to_json()))
+
+    def unlink(self, id, relationship, target_id):
+        self.client.call('DELETE', f"{self.url}/{id}/{relationship}/{target_id}")
+
+
+class TodoClient:
+    def __init__(self, endpoint=ENDPOINT, session=None):
+        self.endpoint = endpoint if endpoint.endswith('/') else endpoint + '/'
+        # One pooled session: every call reuses a keep-alive connection
+        self.session = session or requests.Session()
+        self.todos = Resource(self, Todo)
+        self.projects = Resource(self, Project)
+        self.categories = Resource(self, Category)
+
+    # Decoded response body (None when empty); raises ApiError on 4xx/5xx
+    def call(self, method, url, body=None, params=None):
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+            data = dumps(body)
+        response = self.session.request(method, url, data=data, headers=headers, params=params)
+        content = response.content
+        if response.status_code >= 400:
+            try:
+                decoded = loads(content) if content else None
+            except ValueError:
+                # e.g. the jar's HTML page for unknown routes
+                decoded = None
+            messages = decoded.get('errorMessages', []) if isinstance(decoded, dict) else []
+            raise ApiError(response.status_code, messages)
+        return loads(content) if content else None
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import base64
+import json
+import time
+import xml.etree.ElementTree as ElementTree
+from http import HTTPStatus
+from LoadEngine import ENTITIES
+from AsyncHttpClient import AsyncConnection, header_name, read_request, split_endpoint
+from ResultsWriter import JsonlResultsWriter
+
+# Local recording proxy. Run the thingifier on another port, point this proxy
+# at it and listen on 4567 so the Part1 unittest suite and the Part2 Cucumber
+# stories talk to the proxy unchanged. Every request is forwarded and written
+# to a JSONL trace for TrafficReplay:
+#
+#   {"time": 1.234, "method": "POST", "path": "/todos", "headers": {...},
+#    "body": "...", "body_encoding": "text", "status": 201,
+#    "duration": 0.004, "created": {"entity": "todos", "id": "17"}}
+#
+#   java -jar runTodoManagerRestAPI-1.5.5.jar -port=4568
+#   python TrafficRecorder.py --upstream http://localhost:4568/ --output trace.jsonl
+
+# Headers the proxy frames itself
+HOP_HEADERS = ('host', 'content-length', 'transfer-encoding', 'connection', 'keep-alive')
+
+
+def encode_body(body):
+    if not body:
+        return '', 'text'
+    try:
+        return body.decode('utf-8'), 'text'
+    except UnicodeDecodeError:
+        return base64.b64encode(body).decode('ascii'), 'base64'
+
+
+def decode_body(text, encoding):
+    if not text:
+        return None
+    return base64.b64decode(text) if encoding == 'base64' else text.encode('utf-8')
+
+
+def is_xml(body, content_type):
+    return 'xml' in content_type or body.lstrip().startswith(b'<')
+
+
+# The id of a JSON object or of an XML document (an <id> child of the root
+# element), or None when it has none. Raises ValueError for other bodies.
+def document_id(body, content_type=''):
+    if is_xml(body, content_type):
+        try:
+            return ElementTree.fromstring(body).findtext('id')
+        except ElementTree.ParseError as error:
+            raise ValueError(error)
+    document = json.loads(body)
+    value = document.get('id') if isinstance(document, dict) else None
+    return None if value is None else str(value)
+
+
+# The same document with its id replaced, in the format it came in
+def replace_document_id(body, content_type, id):
+    if is_xml(body, content_type):
+        root = ElementTree.fromstring(body)
+        element = root.find('id')
+        if element is None:
+            element = ElementTree.SubElement(root, 'id')
+        element.text = id
+        return ElementTree.tostring(root)
+    document = json.loads(body)
+    document['id'] = id
+    return json.dumps(document).encode()
+
+
+def content_type(headers):
+    return next((value for name, value in headers.items() if name.lower() == 'content-type'), '')
+
+
+# Which entity a successful POST to `path` creates: /todos -> todos,
+# /todos/1/categories -> categories, /todos/1 (amend) -> None
+def created_entity(path):
+    segments = [segment for segment in path.split('?', 1)[0].split('/') if segment]
+    if len(segments) == 1 and segments[0] in ENTITIES:
+        return segments[0]
+    if len(segments) == 3 and segments[0] in ENTITIES:
+        return ENTITIES[segments[0]].relationships.get(segments[2])
+    return None
+
+
+# Re-frame the upstream response the same way the server did (chunked or
+# content-length) so clients see the original header set
+def encode_response(method, status, headers, body):
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    chunked = headers.get('transfer-encoding', '').lower() == 'chunked'
+    for name, value in headers.items():
+        if name not in HOP_HEADERS:
+            lines.append(f"{header_name(name)}: {value}")
+    if chunked:
+        lines.append("Transfer-Encoding: chunked")
+    elif method == 'HEAD' and 'content-length' in headers:
+        lines.append(f"Content-Length: {headers['content-length']}")
+    else:
+        lines.append(f"Content-Length: {len(body)}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1')
+    if method == 'HEAD':
+        return head
+    if chunked:
+        framed = (f"{len(body):x}\r\n".encode() + body + b"\r\n" if body else b"") + b"0\r\n\r\n"
+        return head + framed
+    return head + body
+
+
+class TrafficRecorder:
+    def __init__(self, upstream, output, block_shutdown=True):
+        self.upstream_host, self.upstream_port, self.base_path = split_endpoint(upstream)
+        self.writer = JsonlResultsWriter(output, flush_every=1)
+        self.block_shutdown = block_shutdown
+        self.start_time = time.perf_counter()
+        self.recorded = 0
+
+    async def handle_client(self, reader, writer):
+        upstream = AsyncConnection(self.upstream_host, self.upstream_port)
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                forward_headers = {header_name(name): value for name, value in headers.items()
+                                   if name not in HOP_HEADERS}
+                received_time = time.perf_counter()
+                if self.block_shutdown and path.rstrip('/').endswith('/shutdown'):
+                    # Keep the real server alive across suites
+                    status, response_headers, response_body = 200, {'content-length': '0'}, b''
+                else:
+                    status, response_headers, response_body = await upstream.request(
+                        method, path, body or None, forward_headers)
+                duration = time.perf_counter() - received_time
+                writer.write(encode_response(method, status, response_headers, response_body))
+                await writer.drain()
+                self.record(received_time, method, path, forward_headers, body, status, duration,
+                            response_headers, response_body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            await upstream.close()
+            writer.close()
+
+    def record(self, received_time, method, path, headers, body, status, duration, response_headers,
+               response_body):
+        text, encoding = encode_body(body)
+        entry = {
+            'time': received_time - self.start_time,
+            'method': method,
+            'path': path,
+            'headers': headers,
+            'body': text,
+            'body_encoding': encoding,
+            'status': status,
+            'duration': duration,
+            'created': None,
+        }
+        entity = created_entity(path) if method == 'POST' and status == 201 else None
+        if entity:
+            try:
+                # A body with an id links an existing object rather than creating one
+                if not body or document_id(body, content_type(headers)) is None:
+                    created_id = document_id(response_body, content_type(response_headers))
+                    if created_id is not None:
+                        entry['created'] = {'entity': entity, 'id': created_id}
+            except ValueError:
+                pass
+        self.writer.write(entry)
+        self.recorded += 1
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Recording {host}:{port} -> {self.upstream_host}:{self.upstream_port}, Ctrl+C to stop")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record thingifier traffic through a local proxy")
+    parser.add_argument('--upstream', default="http://localhost:4568/", help="where the real server listens")
+    parser.add_argument('--listen', default='localhost')
+    parser.add_argument('--port', type=int, default=4567)
+    parser.add_argument('--output', default='trace.jsonl')
+    parser.add_argument('--forward-shutdown', action='store_true',
+                        help="pass /shutdown through instead of answering it in the proxy")
+    args = parser.parse_args()
+
+    recorder = TrafficRecorder(args.upstream, args.output, not args.forward_shutdown)
+    try:
+        asyncio.run(recorder.serve(args.listen, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+        print(f"{recorder.recorded} requests -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
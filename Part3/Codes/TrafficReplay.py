@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import time
+from LoadEngine import ENDPOINT, ENTITIES
+from AsyncHttpClient import AsyncConnection, split_endpoint
+from AsyncDriver import PhaseResult
+from ResultsWriter import read_results
+from RunRecord import record_phase_results
+from TrafficRecorder import content_type, decode_body, document_id, replace_document_id
+
+# Replays a trace written by TrafficRecorder against a thingifier. Requests
+# are reissued at their recorded offsets divided by `speed` (1 = original
+# pacing, 2 = twice as fast) or, with speed=None, as fast as `concurrency`
+# connections allow.
+#
+# IDs the server assigned during recording will differ on replay, so every
+# id in a path (/todos/17/categories/3) or in a JSON or XML link body is
+# looked up in a map filled from the replayed POST responses. A request that
+# uses an id created earlier in the trace waits for that create to finish,
+# so ordering holds even at full speed. IDs the trace never created (the
+# server's fixture data) are sent unchanged.
+
+
+# Route of a request with ids replaced by :id, used to group results, plus
+# the (entity, id, segment index) of every id in the path
+def parse_path(path):
+    path, _, query = path.partition('?')
+    segments = path.split('/')
+    route = []
+    ids = []
+    entity = None
+    for index, segment in enumerate(segments):
+        if not segment:
+            continue
+        if entity is None and segment in ENTITIES:
+            entity = segment
+            route.append(segment)
+        elif entity is not None and segment in ENTITIES[entity].relationships:
+            # /todos/1/categories: ids after this belong to the related entity
+            entity = ENTITIES[entity].relationships[segment]
+            route.append(segment)
+        elif entity is not None:
+            ids.append((entity, segment, index))
+            route.append(':id')
+        else:
+            route.append(segment)
+    return '/' + '/'.join(route), ids, segments, query
+
+
+class ReplayRequest:
+    __slots__ = ('time', 'method', 'path', 'headers', 'body', 'status', 'route', 'ids', 'segments', 'query',
+                 'body_id', 'created', 'depends')
+
+    def __init__(self, entry):
+        self.time = entry['time']
+        self.method = entry['method']
+        self.path = entry['path']
+        self.headers = entry.get('headers') or {}
+        self.body = decode_body(entry.get('body'), entry.get('body_encoding', 'text'))
+        self.status = entry['status']
+        self.route, self.ids, self.segments, self.query = parse_path(self.path)
+        created = entry.get('created')
+        self.created = (created['entity'], created['id']) if created else None
+        # Linking an existing object: POST /todos/1/categories {"id": "3"}
+        self.body_id = None
+        route = self.route.split('/')
+        if self.method == 'POST' and len(route) == 4 and route[2] == ':id' and self.body:
+            try:
+                body_id = document_id(self.body, content_type(self.headers))
+            except ValueError:
+                body_id = None
+            if body_id is not None:
+                self.body_id = (ENTITIES[route[1]].relationships[route[3]], body_id)
+        # Indexes of the earlier requests that created the ids this one uses
+        self.depends = []
+
+    def references(self):
+        keys = [(entity, id) for entity, id, index in self.ids]
+        if self.body_id:
+            keys.append(self.body_id)
+        return keys
+
+
+def load_trace(path, skip_shutdown=True):
+    requests = [ReplayRequest(entry) for entry in read_results(path)]
+    if skip_shutdown:
+        requests = [request for request in requests
+                    if not request.path.split('?', 1)[0].rstrip('/').endswith('/shutdown')]
+    # Recorded with --forward-shutdown, the suites restart the server and it
+    # hands out the same ids again, so one recorded id can be created more
+    # than once: depend on the latest create before each use
+    creators = {}
+    for index, request in enumerate(requests):
+        request.depends = [creators[key] for key in request.references() if key in creators]
+        if request.created:
+            creators[request.created] = index
+    return requests
+
+
+class TrafficReplay:
+    def __init__(self, trace, endpoint=ENDPOINT, speed=1.0, concurrency=16):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive")
+        self.requests = load_trace(trace) if isinstance(trace, str) else trace
+        self.speed = speed
+        self.concurrency = concurrency
+        self.host, self.port, self.base_path = split_endpoint(endpoint)
+        self.prefix = self.base_path.rstrip('/')
+        # (entity, recorded id) -> replayed id
+        self.id_map = {}
+        # Request index -> event set once that replayed create finished
+        self.pending = {}
+        # Requests sent more than 10 ms after their scheduled time
+        self.late = 0
+
+    def remap(self, entity, id):
+        return self.id_map.get((entity, id), id)
+
+    def rewrite(self, request):
+        segments = list(request.segments)
+        for entity, id, index in request.ids:
+            segments[index] = self.remap(entity, id)
+        path = self.prefix + '/'.join(segments)
+        if request.query:
+            path += '?' + request.query
+        body = request.body
+        if request.body_id:
+            body = replace_document_id(body, content_type(request.headers), self.remap(*request.body_id))
+        return path, body
+
+    async def fire(self, index, request, intended_time, pool, results):
+        for creator in request.depends:
+            await self.pending[creator].wait()
+        connection = await pool.get()
+        try:
+            path, body = self.rewrite(request)
+            start_time = time.perf_counter()
+            if intended_time is not None and start_time - intended_time > 0.01:
+                self.late += 1
+            status, headers, response_body = await connection.request(request.method, path, body, request.headers)
+            sample_time = time.perf_counter() - start_time
+            name = f"{request.method} {request.route}"
+            if name not in results:
+                results[name] = PhaseResult(name, self.concurrency)
+            # An error is a different outcome than during recording
+            results[name].add(sample_time, status == request.status)
+            if request.created and status == 201:
+                try:
+                    created_id = document_id(response_body, content_type(headers))
+                except ValueError:
+                    created_id = None
+                if created_id is not None:
+                    self.id_map[request.created] = created_id
+        finally:
+            pool.put_nowait(connection)
+            if request.created:
+                self.pending[index].set()
+
+    async def run_async(self):
+        self.pending = {index: asyncio.Event() for index, request in enumerate(self.requests) if request.created}
+        results = {}
+        pool = asyncio.Queue()
+        connections = [AsyncConnection(self.host, self.port) for i in range(self.concurrency)]
+        for connection in connections:
+            pool.put_nowait(connection)
+
+        tasks = []
+        first_time = self.requests[0].time if self.requests else 0.0
+        start_time = time.perf_counter()
+        for index, request in enumerate(self.requests):
+            intended_time = None
+            if self.speed is not None:
+                intended_time = start_time + (request.time - first_time) / self.speed
+                delay = intended_time - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(self.fire(index, request, intended_time, pool, results)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start_time
+        for result in results.values():
+            result.elapsed = elapsed
+
+        for connection in connections:
+            await connection.close()
+        return results
+
+    def run(self):
+        return asyncio.run(self.run_async())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded request trace against the thingifier")
+    parser.add_argument('trace', help="JSONL trace written by TrafficRecorder")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed factor, 1 = recorded pacing")
+    parser.add_argument('--max-speed', action='store_true', help="ignore recorded timing")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    replay = TrafficReplay(args.trace, args.endpoint, None if args.max_speed else args.speed, args.concurrency)
+    results = replay.run()
+    for name in sorted(results):
+        print(results[name])
+    print(f"{len(replay.requests)} requests, {len(replay.id_map)} ids remapped, {replay.late} sent late")
+    if args.save:
+        record_phase_results(results, dict(vars(args), driver='TrafficReplay')).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from LoadEngine import ENDPOINT, ENTITIES, JSON_HEADERS
+from AsyncHttpClient import AsyncConnection, split_endpoint
+from AsyncDriver import PhaseResult
+from IdPool import IdPool
+from RunRecord import record_phase_results
+
+# Declarative weighted workload profiles. A profile is a list of
+# (kind, target, weight) entries, where target is an entity ('todos') or a
+# relationship ('todos/categories'):
+#
+#   get      GET    /todos/:id          list     GET    /todos
+#   create   POST   /todos              update   PUT    /todos/:id
+#   delete   DELETE /todos/:id          related  GET    /todos/:id/categories
+#   link     POST   /todos/:id/categories {"id": ...}
+#   unlink   DELETE /todos/:id/categories/:id
+#
+# Profiles can also be loaded from JSON:
+#   {"name": "mine", "operations": [{"kind": "get", "target": "todos", "weight": 70}, ...]}
+
+ENTITY_KINDS = ('get', 'list', 'create', 'update', 'delete')
+RELATIONSHIP_KINDS = ('link', 'unlink', 'related')
+
+# Consecutive samples without a possible request before a worker stops
+MAX_SKIPPED = 10000
+
+
+class WorkloadOperation:
+    def __init__(self, kind, target, weight):
+        if kind not in ENTITY_KINDS + RELATIONSHIP_KINDS:
+            raise ValueError(f"Unknown operation kind '{kind}'")
+        if weight <= 0:
+            raise ValueError("weights must be positive")
+        self.kind = kind
+        self.target = target
+        self.weight = weight
+        source, _, relationship = target.partition('/')
+        self.entity = ENTITIES[source]
+        self.relationship = relationship or None
+        if kind in RELATIONSHIP_KINDS:
+            if self.relationship is None:
+                raise ValueError(f"'{kind}' needs a relationship target such as 'todos/categories'")
+            # Raises for relationships the entity does not have
+            self.entity.relationship_url(0, self.relationship)
+            self.related_entity = ENTITIES[self.entity.relationships[self.relationship]]
+        elif self.relationship is not None:
+            raise ValueError(f"'{kind}' targets an entity, not '{target}'")
+        self.name = f"{kind}:{target}"
+
+
+# Walker's alias method: O(1) weighted sampling per request however many
+# operations the profile has
+class WorkloadProfile:
+    def __init__(self, name, operations):
+        if not operations:
+            raise ValueError("a profile needs at least one operation")
+        self.name = name
+        self.operations = [operation if isinstance(operation, WorkloadOperation) else WorkloadOperation(*operation)
+                           for operation in operations]
+        count = len(self.operations)
+        total = sum(operation.weight for operation in self.operations)
+        probability = [operation.weight * count / total for operation in self.operations]
+        alias = list(range(count))
+        small = [index for index, value in enumerate(probability) if value < 1.0]
+        large = [index for index, value in enumerate(probability) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            alias[less] = more
+            probability[more] -= 1.0 - probability[less]
+            (small if probability[more] < 1.0 else large).append(more)
+        for index in small + large:
+            probability[index] = 1.0
+        self.probability = probability
+        self.alias = alias
+
+    def sample(self, rng=random):
+        index = int(rng.random() * len(self.operations))
+        if rng.random() >= self.probability[index]:
+            index = self.alias[index]
+        return self.operations[index]
+
+    def entities(self):
+        entities = {}
+        for operation in self.operations:
+            entities[operation.entity.name] = operation.entity
+            if operation.relationship:
+                entities[operation.related_entity.name] = operation.related_entity
+        return list(entities.values())
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('name', 'custom'),
+                   [(entry['kind'], entry['target'], entry['weight']) for entry in data['operations']])
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+
+PROFILES = {
+    # Read-mostly traffic like production: lookups by id and listings, some
+    # writes, and relationship writes on todos and projects
+    'production': WorkloadProfile('production', [
+        ('get', 'todos', 70),
+        ('list', 'todos', 15),
+        ('update', 'todos', 10),
+        ('create', 'todos', 2),
+        ('delete', 'todos', 2),
+        ('link', 'todos/categories', 0.5),
+        ('link', 'projects/tasks', 0.5),
+    ]),
+    # The original testers' create + update mix, for comparison
+    'write-heavy': WorkloadProfile('write-heavy', [
+        ('create', 'todos', 45),
+        ('update', 'todos', 45),
+        ('delete', 'todos', 10),
+    ]),
+    'relationships': WorkloadProfile('relationships', [
+        ('link', 'todos/categories', 25),
+        ('unlink', 'todos/categories', 20),
+        ('related', 'todos/categories', 20),
+        ('link', 'projects/tasks', 15),
+        ('unlink', 'projects/tasks', 10),
+        ('related', 'projects/tasks', 10),
+    ]),
+}
+
+
+# (source id, target id) pairs of one relationship, for unlink. Pairs are
+# packed in a list so a random pop is a swap with the last one; `positions`
+# maps pair -> index and `by_id` maps each side's id -> its pairs, so dropping
+# a deleted object touches only that object's links.
+class LinkPool:
+    def __init__(self, rng=random):
+        self.pairs = []
+        self.positions = {}
+        self.by_id = ({}, {})
+        self.random = rng
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __contains__(self, pair):
+        return pair in self.positions
+
+    def add(self, pair):
+        if pair in self.positions:
+            return
+        self.positions[pair] = len(self.pairs)
+        self.pairs.append(pair)
+        for side in (0, 1):
+            self.by_id[side].setdefault(pair[side], set()).add(pair)
+
+    def remove(self, pair):
+        position = self.positions.pop(pair)
+        last = self.pairs.pop()
+        if last != pair:
+            self.pairs[position] = last
+            self.positions[last] = position
+        for side in (0, 1):
+            pairs = self.by_id[side][pair[side]]
+            pairs.discard(pair)
+            if not pairs:
+                del self.by_id[side][pair[side]]
+
+    def pop_random(self):
+        if not self.pairs:
+            return None
+        pair = self.pairs[self.random.randrange(len(self.pairs))]
+        self.remove(pair)
+        return pair
+
+    # Drop every pair whose source (side 0) or target (side 1) is `id`
+    def forget(self, side, id):
+        for pair in list(self.by_id[side].get(id, ())):
+            self.remove(pair)
+
+
+# Runs a profile with `concurrency` in-flight requests, sampling the next
+# operation per request. Every entity the profile touches is first seeded
+# with `initial_objects` objects so reads and links have targets.
+class WorkloadDriver:
+    def __init__(self, profile, endpoint=ENDPOINT, concurrency=16, initial_objects=100, seed=None):
+        if isinstance(profile, str):
+            profile = PROFILES[profile]
+        self.profile = profile
+        self.concurrency = concurrency
+        self.initial_objects = initial_objects
+        self.host, self.port, self.base_path = split_endpoint(endpoint)
+        self.random = random.Random(seed)
+        self.ids = {entity.name: IdPool(rng=self.random) for entity in profile.entities()}
+        self.links = {operation.target: LinkPool(self.random) for operation in profile.operations
+                      if operation.relationship}
+        # Pairs popped for an unlink whose response has not arrived yet
+        self.unlinking = {target: set() for target in self.links}
+
+    # Drop the recorded links of a deleted object, so later unlinks do not
+    # target it and count as errors
+    def forget(self, entity_name, id):
+        for operation in self.profile.operations:
+            if operation.kind != 'link':
+                continue
+            if operation.entity.name == entity_name:
+                side = 0
+            elif operation.related_entity.name == entity_name:
+                side = 1
+            else:
+                continue
+            self.links[operation.target].forget(side, id)
+
+    # Returns (method, path, body, callback) or None when the operation has no
+    # target yet (e.g. unlink before any link exists). callback(status,
+    # response) runs once the response arrives, whatever its status.
+    def build_request(self, operation):
+        entity = operation.entity
+        ids = self.ids[entity.name]
+        base = self.base_path
+        kind = operation.kind
+        if kind == 'list':
+            return 'GET', entity.collection_url(base), None, None
+        if kind == 'create':
+            body = json.dumps(entity.generate_payload(self.random)).encode()
+
+            def record_create(status, response):
+                if status < 400:
+                    ids.add(json.loads(response)['id'])
+
+            return 'POST', entity.collection_url(base), body, record_create
+        if not ids:
+            return None
+        if kind == 'get':
+            return 'GET', entity.instance_url(ids.choice(), base), None, None
+        if kind == 'update':
+            body = json.dumps(entity.generate_payload(self.random)).encode()
+            return 'PUT', entity.instance_url(ids.choice(), base), body, None
+        if kind == 'delete':
+            id = ids.pop_random()
+            self.forget(entity.name, id)
+            return 'DELETE', entity.instance_url(id, base), None, None
+        if kind == 'related':
+            return 'GET', entity.relationship_url(ids.choice(), operation.relationship, endpoint=base), None, None
+        if kind == 'link':
+            targets = self.ids[operation.related_entity.name]
+            if not targets:
+                return None
+            source, target = ids.choice(), targets.choice()
+            body = json.dumps({'id': str(target)}).encode()
+            links = self.links[operation.target]
+            unlinking = self.unlinking[operation.target]
+
+            # Skip a pair deleted, or being unlinked, while the request was in flight
+            def record_link(status, response):
+                pair = (source, target)
+                if status < 400 and source in ids and target in targets and pair not in unlinking:
+                    links.add(pair)
+
+            return ('POST', entity.relationship_url(source, operation.relationship, endpoint=base), body,
+                    record_link)
+        link = self.links[operation.target].pop_random()
+        if link is None:
+            return None
+        unlinking = self.unlinking[operation.target]
+        unlinking.add(link)
+        return ('DELETE', entity.relationship_url(link[0], operation.relationship, link[1], base), None,
+                lambda status, response: unlinking.discard(link))
+
+    async def populate(self):
+        connection = AsyncConnection(self.host, self.port)
+        try:
+            for entity in self.profile.entities():
+                for i in range(self.initial_objects):
+                    body = json.dumps(entity.generate_payload(self.random)).encode()
+                    status, headers, response = await connection.request(
+                        'POST', entity.collection_url(self.base_path), body, JSON_HEADERS)
+                    if status == 201:
+                        self.ids[entity.name].add(json.loads(response)['id'])
+        finally:
+            await connection.close()
+
+    async def worker(self, budget, results):
+        connection = AsyncConnection(self.host, self.port)
+        skipped = 0
+        try:
+            while budget[0] > 0:
+                operation = self.profile.sample(self.random)
+                request = self.build_request(operation)
+                if request is None:
+                    # Let other workers create targets; give up if the profile
+                    # can never produce a request (e.g. only unlinks)
+                    skipped += 1
+                    if skipped > MAX_SKIPPED:
+                        break
+                    await asyncio.sleep(0)
+                    continue
+                skipped = 0
+                budget[0] -= 1
+                method, path, body, callback = request
+                start_time = time.perf_counter()
+                status, headers, response = await connection.request(method, path, body, JSON_HEADERS)
+                sample_time = time.perf_counter() - start_time
+                results[operation.name].add(sample_time, status < 400)
+                if callback:
+                    callback(status, response)
+        finally:
+            await connection.close()
+
+    async def run_async(self, num_requests):
+        await self.populate()
+        results = {operation.name: PhaseResult(operation.name, self.concurrency)
+                   for operation in self.profile.operations}
+        budget = [num_requests]
+        start_time = time.perf_counter()
+        await asyncio.gather(*(self.worker(budget, results) for i in range(self.concurrency)))
+        elapsed = time.perf_counter() - start_time
+        for result in results.values():
+            result.elapsed = elapsed
+        return results
+
+    def run(self, num_requests):
+        return asyncio.run(self.run_async(num_requests))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a weighted workload profile against the thingifier")
+    parser.add_argument('--profile', default='production', choices=sorted(PROFILES))
+    parser.add_argument('--profile-file', help="JSON profile, overrides --profile")
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--initial-objects', type=int, default=100)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--endpoint', default=ENDPOINT)
+    parser.add_argument('--save', help="write the run as a RunRecord JSON for CompareRuns")
+    args = parser.parse_args()
+
+    profile = WorkloadProfile.load(args.profile_file) if args.profile_file else PROFILES[args.profile]
+    driver = WorkloadDriver(profile, args.endpoint, args.concurrency, args.initial_objects, args.seed)
+    results = driver.run(args.requests)
+    for result in results.values():
+        print(result)
+    if args.save:
+        record_phase_results(results, dict(vars(args), profile=profile.name)).save(args.save)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import math
+import unittest
+from HdrHistogram import HdrHistogram
+from RunRecord import RunRecord
+from CompareRuns import compare_runs, ks_p_value, ks_statistic
+
+
+def histogram_of(values):
+    histogram = HdrHistogram()
+    for value in values:
+        histogram.record_value(value)
+    return histogram
+
+
+def record_of(values, throughput=None):
+    record = RunRecord()
+    record.add_series('GET', histogram_of(values), throughput)
+    return record
+
+
+class KsStatisticTest(unittest.TestCase):
+    # Values below 2048 us get one bucket each, so these CDFs are exact
+
+    def test_identical_samples(self):
+        values = list(range(1, 501))
+        self.assertEqual(0.0, ks_statistic(histogram_of(values), histogram_of(values)))
+
+    def test_disjoint_samples(self):
+        self.assertEqual(1.0, ks_statistic(histogram_of(range(1, 101)), histogram_of(range(200, 300))))
+
+    def test_half_overlapping_samples(self):
+        self.assertAlmostEqual(0.5, ks_statistic(histogram_of(range(1, 101)), histogram_of(range(51, 151))))
+
+    def test_different_sizes(self):
+        # CDFs of {1, 2} and {1, 1, 1, 2}: 0.5 vs 0.75 at 1
+        self.assertAlmostEqual(0.25, ks_statistic(histogram_of([1, 2]), histogram_of([1, 1, 1, 2])))
+
+    def test_symmetric(self):
+        a, b = histogram_of([5, 9, 9, 40, 41]), histogram_of([1, 9, 30, 30])
+        self.assertEqual(ks_statistic(a, b), ks_statistic(b, a))
+
+
+class KsPValueTest(unittest.TestCase):
+    def distance_for(self, lam, n, m):
+        root = math.sqrt(n * m / (n + m))
+        return lam / (root + 0.12 + 0.11 / root)
+
+    def test_known_critical_values(self):
+        # Kolmogorov distribution: Q(1.3581) = 0.05, Q(1.6276) = 0.01
+        for lam, expected in ((1.3581, 0.05), (1.6276, 0.01), (1.2238, 0.10)):
+            self.assertAlmostEqual(expected, ks_p_value(self.distance_for(lam, 5000, 5000), 5000, 5000), places=3)
+
+    def test_bounds(self):
+        self.assertEqual(1.0, ks_p_value(0.0, 100, 100))
+        self.assertEqual(0.0, ks_p_value(1.0, 10000, 10000))
+        self.assertLessEqual(ks_p_value(0.01, 3, 4), 1.0)
+
+    def test_more_samples_means_more_significant(self):
+        self.assertGreater(ks_p_value(0.1, 100, 100), ks_p_value(0.1, 1000, 1000))
+
+
+class CompareRunsTest(unittest.TestCase):
+    def test_same_run_does_not_regress(self):
+        values = [100 + index % 50 for index in range(2000)]
+        comparisons = compare_runs(record_of(values, 500.0), record_of(values, 500.0))
+        self.assertEqual(['GET'], [comparison.name for comparison in comparisons])
+        self.assertFalse(comparisons[0].regressed)
+        self.assertEqual(1.0, comparisons[0].p_value)
+
+    def test_slower_run_regresses(self):
+        baseline = [100 + index % 50 for index in range(2000)]
+        slower = [value * 2 for value in baseline]
+        comparison, = compare_runs(record_of(baseline), record_of(slower))
+        self.assertTrue(comparison.regressed)
+        self.assertLess(comparison.p_value, 0.01)
+        self.assertIn('mean', ' '.join(comparison.reasons))
+
+    def test_faster_run_does_not_regress(self):
+        baseline = [200 + index % 50 for index in range(2000)]
+        faster = [value // 2 for value in baseline]
+        comparison, = compare_runs(record_of(baseline), record_of(faster))
+        self.assertFalse(comparison.regressed)
+
+    def test_throughput_drop_regresses(self):
+        values = [100 + index % 50 for index in range(2000)]
+        comparison, = compare_runs(record_of(values, 500.0), record_of(values, 400.0))
+        self.assertEqual(['throughput -20.0%'], comparison.reasons)
+
+    def test_only_shared_series_are_compared(self):
+        baseline, new = record_of([100]), record_of([100])
+        baseline.add_series('POST', histogram_of([100]))
+        self.assertEqual(['GET'], [comparison.name for comparison in compare_runs(baseline, new)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import math
+import random
+import unittest
+from HdrHistogram import HdrHistogram, MICROSECONDS
+
+
+def exact_percentile(values, percentile):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(percentile / 100.0 * len(ordered)), 1) - 1]
+
+
+class HdrHistogramTest(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(42)
+        # Log-uniform from 1 us to 10 s, like a mix of fast and stalled requests
+        self.values = [int(10 ** self.random.uniform(0, 7)) for i in range(20000)]
+
+    def histogram_of(self, values, significant_figures=3):
+        histogram = HdrHistogram(significant_figures=significant_figures)
+        for value in values:
+            histogram.record_value(value)
+        return histogram
+
+    def test_every_value_falls_in_its_bucket(self):
+        histogram = HdrHistogram()
+        for value in list(range(5000)) + self.values:
+            lowest, highest = histogram.value_range_at(histogram.counts_index(value))
+            self.assertLessEqual(lowest, value)
+            self.assertLessEqual(value, highest)
+
+    def test_percentiles_within_precision(self):
+        for significant_figures in (2, 3, 4):
+            histogram = self.histogram_of(self.values, significant_figures)
+            for percentile in (1.0, 50.0, 90.0, 99.0, 99.9, 100.0):
+                exact = exact_percentile(self.values, percentile)
+                reported = histogram.value_at_percentile(percentile) * MICROSECONDS
+                # Reported as the bucket's upper bound, never below the exact value
+                self.assertGreaterEqual(reported, exact)
+                self.assertLessEqual(reported - exact, exact * 10 ** -significant_figures + 1)
+
+    def test_percentiles_matches_value_at_percentile(self):
+        histogram = self.histogram_of(self.values)
+        percentiles = (99.9, 50.0, 0.0, 95.0, 100.0)
+        self.assertEqual({percentile: histogram.value_at_percentile(percentile) for percentile in percentiles},
+                         histogram.percentiles(percentiles))
+
+    def test_merge_equals_recording_everything_once(self):
+        first, second = self.values[:7000], self.values[7000:]
+        merged = self.histogram_of(first).merge(self.histogram_of(second))
+        combined = self.histogram_of(self.values)
+        self.assertEqual(combined.counts, merged.counts)
+        self.assertEqual(combined.summary(), merged.summary())
+
+    def test_merge_into_empty(self):
+        histogram = self.histogram_of(self.values)
+        merged = HdrHistogram().merge(histogram)
+        self.assertEqual(histogram.summary(), merged.summary())
+
+    def test_merge_rejects_other_layouts(self):
+        with self.assertRaises(ValueError):
+            HdrHistogram(significant_figures=3).merge(HdrHistogram(significant_figures=2))
+        with self.assertRaises(ValueError):
+            HdrHistogram(highest_trackable=MICROSECONDS).merge(HdrHistogram())
+
+    def test_out_of_range_values_are_clamped(self):
+        histogram = HdrHistogram(highest_trackable=MICROSECONDS)
+        histogram.record_value(-5)
+        histogram.record_value(10 * MICROSECONDS)
+        self.assertEqual(0, histogram.min_value)
+        self.assertEqual(MICROSECONDS, histogram.max_value)
+        self.assertEqual(1.0, histogram.value_at_percentile(100.0))
+
+    def test_record_rounds_seconds_to_microseconds(self):
+        histogram = HdrHistogram()
+        histogram.record(0.0012345)
+        self.assertEqual(1235, histogram.max_value)
+
+    def test_empty_histogram(self):
+        histogram = HdrHistogram()
+        self.assertEqual(0.0, histogram.value_at_percentile(99.0))
+        self.assertEqual({50.0: 0.0}, histogram.percentiles((50.0,)))
+        self.assertEqual(0.0, histogram.mean)
+
+    def test_dict_round_trip(self):
+        histogram = self.histogram_of(self.values)
+        restored = HdrHistogram.from_dict(histogram.to_dict())
+        self.assertEqual(histogram.counts, restored.counts)
+        self.assertEqual(histogram.summary(), restored.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import random
+import threading
+import unittest
+from IdPool import ABSENT, IdPool
+
+
+class IdPoolTest(unittest.TestCase):
+    def assertConsistent(self, pool, expected):
+        self.assertEqual(sorted(expected), sorted(pool))
+        self.assertEqual(len(expected), len(pool))
+        # positions maps every live id to its slot and everything else to ABSENT
+        for position, id in enumerate(pool.ids):
+            self.assertEqual(position, pool.positions[id])
+        live = set(expected)
+        for id, position in enumerate(pool.positions):
+            if id not in live:
+                self.assertEqual(ABSENT, position)
+
+    def test_add_is_idempotent(self):
+        pool = IdPool([3, 1, 3, 2, 1])
+        self.assertConsistent(pool, [1, 2, 3])
+
+    def test_rejects_negative_ids(self):
+        with self.assertRaises(ValueError):
+            IdPool().add(-1)
+
+    def test_accepts_string_ids(self):
+        pool = IdPool(['7'])
+        self.assertIn(7, pool)
+        self.assertIn('7', pool)
+        pool.remove('7')
+        self.assertFalse(pool)
+
+    def test_remove_swaps_last_into_hole(self):
+        pool = IdPool([10, 20, 30, 40])
+        pool.remove(20)
+        self.assertEqual([10, 40, 30], list(pool.ids))
+        self.assertConsistent(pool, [10, 30, 40])
+        pool.remove(30)
+        pool.remove(10)
+        pool.remove(40)
+        self.assertConsistent(pool, [])
+
+    def test_remove_missing_raises_and_discard_does_not(self):
+        pool = IdPool([1])
+        with self.assertRaises(KeyError):
+            pool.remove(2)
+        with self.assertRaises(KeyError):
+            pool.remove(1000)
+        pool.discard(2)
+        self.assertConsistent(pool, [1])
+
+    def test_membership_past_the_positions_array(self):
+        pool = IdPool([5])
+        self.assertNotIn(6, pool)
+        self.assertNotIn(10 ** 6, pool)
+        self.assertNotIn(-1, pool)
+
+    def test_random_churn_matches_a_set(self):
+        rng = random.Random(7)
+        pool = IdPool(rng=rng)
+        expected = set()
+        for step in range(5000):
+            action = rng.random()
+            if action < 0.5:
+                id = rng.randrange(2000)
+                pool.add(id)
+                expected.add(id)
+            elif action < 0.75 and expected:
+                expected.remove(pool.pop_random())
+            elif expected:
+                id = rng.choice(sorted(expected))
+                pool.remove(id)
+                expected.remove(id)
+            if step % 500 == 0:
+                self.assertConsistent(pool, expected)
+        self.assertConsistent(pool, expected)
+
+    def test_choice_and_pop_on_empty_pool(self):
+        pool = IdPool()
+        with self.assertRaises(IndexError):
+            pool.choice()
+        with self.assertRaises(IndexError):
+            pool.pop_random()
+
+    def test_pop_random_drains_every_id_once(self):
+        pool = IdPool(range(100), rng=random.Random(1))
+        popped = [pool.pop_random() for i in range(100)]
+        self.assertEqual(list(range(100)), sorted(popped))
+        self.assertFalse(pool)
+
+    def test_iteration_is_a_snapshot(self):
+        pool = IdPool([1, 2, 3])
+        for id in pool:
+            pool.remove(id)
+        self.assertConsistent(pool, [])
+
+    def test_shared_between_threads(self):
+        pool = IdPool()
+
+        def add_range(start):
+            for id in range(start, start + 1000):
+                pool.add(id)
+
+        threads = [threading.Thread(target=add_range, args=(start,)) for start in range(0, 4000, 1000)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertConsistent(pool, range(4000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+from SoakTest import SoakTest, TrendLine, parse_duration
+
+
+class TrendLineTest(unittest.TestCase):
+    def test_exact_line(self):
+        trend = TrendLine()
+        for x in range(10):
+            trend.add(x, 3.0 + 2.5 * x)
+        self.assertAlmostEqual(2.5, trend.slope)
+        self.assertAlmostEqual(3.0, trend.intercept)
+        self.assertAlmostEqual(1.0, trend.r_squared)
+        self.assertEqual(9, trend.span)
+
+    def test_matches_batch_least_squares(self):
+        rng = random.Random(9)
+        points = [(x * 0.1, 100 + 0.7 * x * 0.1 + rng.gauss(0, 2)) for x in range(500)]
+        trend = TrendLine()
+        for x, y in points:
+            trend.add(x, y)
+        n = len(points)
+        mean_x = sum(x for x, y in points) / n
+        mean_y = sum(y for x, y in points) / n
+        sxx = sum((x - mean_x) ** 2 for x, y in points)
+        syy = sum((y - mean_y) ** 2 for x, y in points)
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+        self.assertAlmostEqual(sxy / sxx, trend.slope, places=9)
+        self.assertAlmostEqual(mean_y - sxy / sxx * mean_x, trend.intercept, places=6)
+        self.assertAlmostEqual(sxy * sxy / (sxx * syy), trend.r_squared, places=9)
+
+    def test_flat_noise_has_low_r_squared(self):
+        rng = random.Random(4)
+        trend = TrendLine()
+        for x in range(1000):
+            trend.add(x, 500 + rng.uniform(-20, 20))
+        self.assertLess(abs(trend.slope), 0.01)
+        self.assertLess(trend.r_squared, 0.05)
+
+    def test_degenerate_inputs(self):
+        trend = TrendLine()
+        self.assertEqual((0.0, 0.0, 0.0, 0.0), (trend.slope, trend.intercept, trend.r_squared, trend.span))
+        trend.add(5, 1.0)
+        self.assertEqual(0.0, trend.slope)
+        self.assertEqual(1.0, trend.intercept)
+        trend.add(5, 2.0)
+        # Every x equal: no slope can be fitted
+        self.assertEqual(0.0, trend.slope)
+        self.assertEqual(0.0, trend.r_squared)
+        constant = TrendLine()
+        for x in range(5):
+            constant.add(x, 7.0)
+        self.assertEqual(0.0, constant.slope)
+        self.assertEqual(0.0, constant.r_squared)
+
+
+class VerdictTest(unittest.TestCase):
+    def soak(self, population, concurrency, counts):
+        soak = SoakTest('todos', population=population, concurrency=concurrency, duration=10.0, warmup=1.0)
+        for x, count in enumerate(counts):
+            soak.count_trend.add(x, count)
+        return soak
+
+    def test_drift_within_concurrency_is_flat(self):
+        soak = self.soak(50, 8, [50, 51, 53])
+        self.assertEqual(8, soak.drift_limit)
+        self.assertLessEqual(soak.verdict()[3], soak.drift_limit)
+
+    def test_large_population_uses_the_fraction(self):
+        self.assertEqual(50.0, self.soak(1000, 8, []).drift_limit)
+
+    def test_steady_growth_is_not_flat(self):
+        soak = self.soak(50, 8, [50, 60, 70, 80])
+        self.assertGreater(soak.verdict()[3], soak.drift_limit)
+
+
+class ParseDurationTest(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(90.0, parse_duration('90s'))
+        self.assertEqual(1800.0, parse_duration('30m'))
+        self.assertEqual(5400.0, parse_duration('1.5h'))
+        self.assertEqual(12.0, parse_duration(' 12 '))
+
+
+if __name__ == '__main__':
+    unittest.main()
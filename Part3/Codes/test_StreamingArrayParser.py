@@ -0,0 +1,82 @@
+import json
+import unittest
+from ReadBenchmark import StreamingArrayParser
+
+TODOS = [
+    {'id': '1', 'title': 'scan paperwork', 'doneStatus': 'false', 'description': '',
+     'tasksof': [{'id': '1'}], 'categories': [{'id': '2'}, {'id': '3'}]},
+    {'id': '2', 'title': 'naïve café ☕ 𝄞', 'doneStatus': 'true', 'description': 'brackets ] [ and commas , inside'},
+    {'id': '3', 'title': 'quotes " and \\ and "todos": [', 'doneStatus': 'false', 'description': '{}'},
+]
+
+
+def parse(chunks, key='todos'):
+    parser = StreamingArrayParser(key)
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return parser, items
+
+
+def split_every(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+class StreamingArrayParserTest(unittest.TestCase):
+    def setUp(self):
+        self.body = json.dumps({'todos': TODOS}, ensure_ascii=False).encode('utf-8')
+
+    def test_whole_body(self):
+        parser, items = parse([self.body])
+        self.assertEqual(TODOS, items)
+        self.assertEqual(3, parser.items)
+        self.assertTrue(parser.done)
+
+    def test_every_chunk_size(self):
+        # Chunk boundaries fall inside the key, inside elements and inside
+        # multi-byte UTF-8 characters
+        for size in range(1, len(self.body) + 1):
+            parser, items = parse(split_every(self.body, size))
+            self.assertEqual(TODOS, items, f"chunk size {size}")
+            self.assertTrue(parser.done)
+
+    def test_every_split_point(self):
+        for split in range(len(self.body) + 1):
+            parser, items = parse([self.body[:split], self.body[split:]])
+            self.assertEqual(TODOS, items, f"split at {split}")
+
+    def test_items_are_yielded_as_soon_as_complete(self):
+        first = json.dumps(TODOS[0]).encode()
+        parser = StreamingArrayParser('todos')
+        self.assertEqual([], list(parser.feed(b'{"todos": [' + first[:10])))
+        self.assertEqual([TODOS[0]], list(parser.feed(first[10:] + b', {"id"')))
+        self.assertEqual(1, parser.items)
+        self.assertFalse(parser.done)
+
+    def test_consumed_input_is_dropped(self):
+        parser = StreamingArrayParser('todos')
+        list(parser.feed(b'{"todos": [' + json.dumps(TODOS[0]).encode() + b', '))
+        self.assertEqual('', parser.buffer.strip(' ,'))
+
+    def test_key_after_other_members(self):
+        body = json.dumps({'count': 3, 'todos': TODOS, 'next': None}).encode()
+        parser, items = parse(split_every(body, 7))
+        self.assertEqual(TODOS, items)
+
+    def test_empty_array(self):
+        parser, items = parse(split_every(b'{"projects": [ ]}', 3), 'projects')
+        self.assertEqual([], items)
+        self.assertTrue(parser.done)
+
+    def test_input_after_the_array_is_ignored(self):
+        parser, items = parse([b'{"todos": [{"id": "1"}]', b', "todos": [{"id": "2"}]}'])
+        self.assertEqual([{'id': '1'}], items)
+
+    def test_missing_key_yields_nothing(self):
+        parser, items = parse([b'{"errorMessages": ["Could not find"]}'])
+        self.assertEqual([], items)
+        self.assertFalse(parser.done)
+
+
+if __name__ == '__main__':
+    unittest.main()
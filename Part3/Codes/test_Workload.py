@@ -0,0 +1,149 @@
+import json
+import random
+import unittest
+from Workload import PROFILES, LinkPool, WorkloadDriver, WorkloadOperation, WorkloadProfile
+
+
+def alias_frequencies(profile):
+    # Exact probability of each operation under the alias table
+    count = len(profile.operations)
+    frequencies = [0.0] * count
+    for index in range(count):
+        frequencies[index] += profile.probability[index] / count
+        frequencies[profile.alias[index]] += (1.0 - profile.probability[index]) / count
+    return frequencies
+
+
+class WorkloadProfileTest(unittest.TestCase):
+    def test_alias_table_reproduces_the_weights(self):
+        rng = random.Random(3)
+        profiles = list(PROFILES.values())
+        profiles.append(WorkloadProfile('single', [('get', 'todos', 5)]))
+        profiles.append(WorkloadProfile('random', [('get', 'todos', rng.uniform(0.01, 100)) for i in range(50)]))
+        for profile in profiles:
+            total = sum(operation.weight for operation in profile.operations)
+            for operation, frequency in zip(profile.operations, alias_frequencies(profile)):
+                self.assertAlmostEqual(operation.weight / total, frequency, places=12, msg=profile.name)
+            for probability in profile.probability:
+                self.assertTrue(0.0 <= probability <= 1.0)
+
+    def test_sampling_follows_the_weights(self):
+        profile = PROFILES['production']
+        rng = random.Random(11)
+        samples = 200000
+        counts = {operation.name: 0 for operation in profile.operations}
+        for i in range(samples):
+            counts[profile.sample(rng).name] += 1
+        total = sum(operation.weight for operation in profile.operations)
+        for operation in profile.operations:
+            expected = operation.weight / total
+            # Five standard deviations of a binomial proportion
+            tolerance = 5 * (expected * (1 - expected) / samples) ** 0.5
+            self.assertAlmostEqual(expected, counts[operation.name] / samples, delta=tolerance)
+
+    def test_entities_include_related(self):
+        names = sorted(entity.name for entity in PROFILES['relationships'].entities())
+        self.assertEqual(['categories', 'projects', 'todos'], names)
+
+    def test_from_dict(self):
+        profile = WorkloadProfile.from_dict(json.loads(
+            '{"name": "mine", "operations": [{"kind": "get", "target": "todos", "weight": 3},'
+            ' {"kind": "link", "target": "todos/categories", "weight": 1}]}'))
+        self.assertEqual('mine', profile.name)
+        self.assertEqual(['get:todos', 'link:todos/categories'], [operation.name for operation in profile.operations])
+
+    def test_invalid_operations(self):
+        for kind, target, weight in (('fetch', 'todos', 1), ('get', 'todos', 0), ('link', 'todos', 1),
+                                     ('get', 'todos/categories', 1), ('link', 'todos/owners', 1)):
+            with self.assertRaises((ValueError, KeyError), msg=(kind, target, weight)):
+                WorkloadOperation(kind, target, weight)
+        with self.assertRaises(ValueError):
+            WorkloadProfile('empty', [])
+
+
+class LinkPoolTest(unittest.TestCase):
+    def assertConsistent(self, pool, expected):
+        self.assertEqual(sorted(expected), sorted(pool.pairs))
+        for position, pair in enumerate(pool.pairs):
+            self.assertEqual(position, pool.positions[pair])
+        for side in (0, 1):
+            index = {}
+            for pair in expected:
+                index.setdefault(pair[side], set()).add(pair)
+            self.assertEqual(index, pool.by_id[side])
+
+    def test_add_remove_and_pop(self):
+        pool = LinkPool(random.Random(1))
+        pairs = [(source, target) for source in range(5) for target in range(4)]
+        for pair in pairs + pairs[:3]:
+            pool.add(pair)
+        self.assertConsistent(pool, pairs)
+        pool.remove((2, 1))
+        pairs.remove((2, 1))
+        self.assertConsistent(pool, pairs)
+        popped = [pool.pop_random() for i in range(len(pairs))]
+        self.assertEqual(sorted(pairs), sorted(popped))
+        self.assertIsNone(pool.pop_random())
+        self.assertConsistent(pool, [])
+
+    def test_forget_drops_only_that_ids_pairs(self):
+        pool = LinkPool(random.Random(1))
+        pairs = [(source, target) for source in range(5) for target in range(4)]
+        for pair in pairs:
+            pool.add(pair)
+        pool.forget(0, 3)
+        pool.forget(1, 2)
+        expected = [pair for pair in pairs if pair[0] != 3 and pair[1] != 2]
+        self.assertConsistent(pool, expected)
+        pool.forget(0, 99)
+        self.assertConsistent(pool, expected)
+
+
+class WorkloadDriverTest(unittest.TestCase):
+    def setUp(self):
+        self.driver = WorkloadDriver(WorkloadProfile('links', [('link', 'todos/categories', 1),
+                                                               ('unlink', 'todos/categories', 1),
+                                                               ('delete', 'todos', 1)]), seed=5)
+        self.link, self.unlink, self.delete = self.driver.profile.operations
+        for id in range(1, 4):
+            self.driver.ids['todos'].add(id)
+            self.driver.ids['categories'].add(id)
+
+    def test_link_is_recorded_only_on_success(self):
+        method, path, body, callback = self.driver.build_request(self.link)
+        callback(404, b'')
+        self.assertEqual(0, len(self.driver.links['todos/categories']))
+        callback(201, b'')
+        self.assertEqual(1, len(self.driver.links['todos/categories']))
+
+    def test_link_answered_during_an_unlink_is_not_recorded(self):
+        links = self.driver.links['todos/categories']
+        first = self.driver.build_request(self.link)
+        first[3](201, b'')
+        pair = links.pairs[0]
+        # A second link of the same pair is in flight when the unlink is sent
+        self.driver.random.seed(5)
+        second = self.driver.build_request(self.link)
+        self.assertEqual(first[:3], second[:3])
+        method, path, body, finish_unlink = self.driver.build_request(self.unlink)
+        self.assertEqual('DELETE', method)
+        self.assertTrue(path.endswith(f"/todos/{pair[0]}/categories/{pair[1]}"))
+        second[3](201, b'')
+        self.assertNotIn(pair, links)
+        finish_unlink(200, b'')
+        self.assertEqual(set(), self.driver.unlinking['todos/categories'])
+
+    def test_delete_forgets_the_objects_links(self):
+        links = self.driver.links['todos/categories']
+        for source in range(1, 4):
+            for target in range(1, 4):
+                links.add((source, target))
+        method, path, body, callback = self.driver.build_request(self.delete)
+        deleted = int(path.rstrip('/').rsplit('/', 1)[1])
+        self.assertNotIn(deleted, self.driver.ids['todos'])
+        self.assertEqual(sorted(pair for pair in links.pairs if pair[0] != deleted), sorted(links.pairs))
+        self.assertEqual(6, len(links))
+
+
+if __name__ == '__main__':
+    unittest.main()